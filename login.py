@@ -1,15 +1,16 @@
 import pygame
+import numpy as np
+from collections import OrderedDict
+import argparse
+import itertools
 import math
+import os
 import random
-import sys
-
-# Initialize pygame
-pygame.init()
+import time
 
 # Screen dimensions
 WIDTH, HEIGHT = 1000, 700
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Interactive Fireworks Simulator")
+FPS = 60
 
 # Colors
 NIGHT_BLUE = (5, 10, 30)
@@ -19,58 +20,419 @@ MOUNTAIN_COLOR = (20, 25, 40)
 WATER_COLOR = (10, 60, 100, 100)
 WATER_HIGHLIGHT = (150, 200, 255, 50)
 
-# Particle class for fireworks
-class Particle:
-    def __init__(self, x, y, color, velocity_x, velocity_y, radius, decay_rate=0.97, gravity=0.1):
-        self.x = x
-        self.y = y
-        self.color = color
-        self.velocity_x = velocity_x
-        self.velocity_y = velocity_y
-        self.radius = radius
-        self.original_radius = radius
-        self.decay_rate = decay_rate
-        self.gravity = gravity
-        self.life = 1.0
-        self.trail = []
-        self.max_trail = 10
-        
+# Seed for the background star field
+STAR_SEED = 1234
+
+# Random source for vectorized particle spawning
+rng = np.random.default_rng()
+
+def seed_random(seed):
+    global rng
+    random.seed(seed)
+    rng = np.random.default_rng(seed)
+
+# LRU cache of pre-rendered soft circles keyed by quantized (color, radius, alpha)
+class SpriteCache:
+    COLOR_STEP = 8
+    RADIUS_STEPS_PER_PIXEL = 2
+    ALPHA_STEP = 16
+
+    def __init__(self, max_bytes=8 * 1024 * 1024, additive=False):
+        # Additive sprites are opaque with color premultiplied by alpha, for BLEND_ADD
+        self.max_bytes = max_bytes
+        self.additive = additive
+        self.used_bytes = 0
+        self.sprites = OrderedDict()
+
+    def color_key(self, color):
+        # Quantize a color once so per-point lookups only touch radius and alpha
+        return tuple(min(255, int(c)) // self.COLOR_STEP for c in color[:3])
+
+    def clear(self):
+        self.sprites.clear()
+        self.used_bytes = 0
+
+    def get(self, color_key, radius, alpha=255):
+        return self.lookup((color_key, int(radius * self.RADIUS_STEPS_PER_PIXEL + 0.5),
+                            int(alpha) // self.ALPHA_STEP))
+
+    def lookup(self, key):
+        sprite = self.sprites.get(key)
+        if sprite is not None:
+            self.sprites.move_to_end(key)
+            return sprite
+        if key[1] <= 0 or key[2] <= 0:
+            return None
+
+        sprite = self._render(key)
+        self.sprites[key] = sprite
+        self.used_bytes += sprite.get_width() * sprite.get_height() * 4
+
+        # Evict least recently used sprites once over the memory cap
+        while self.used_bytes > self.max_bytes and len(self.sprites) > 1:
+            _, old = self.sprites.popitem(last=False)
+            self.used_bytes -= old.get_width() * old.get_height() * 4
+        return sprite
+
+    def _render(self, key):
+        color_key, radius_key, alpha_key = key
+        color = tuple(c * self.COLOR_STEP + self.COLOR_STEP // 2 for c in color_key)
+        radius = radius_key / self.RADIUS_STEPS_PER_PIXEL
+        alpha = min(255, alpha_key * self.ALPHA_STEP + self.ALPHA_STEP // 2)
+
+        size = int(radius * 2) + 4
+        center = size / 2
+        # Faint halo one pixel wider than the core softens the edge
+        if self.additive:
+            s = pygame.Surface((size, size))
+            pygame.draw.circle(s, [c * alpha // 765 for c in color], (center, center), radius + 1)
+            pygame.draw.circle(s, [c * alpha // 255 for c in color], (center, center), radius)
+        else:
+            s = pygame.Surface((size, size), pygame.SRCALPHA)
+            pygame.draw.circle(s, (*color, alpha // 3), (center, center), radius + 1)
+            pygame.draw.circle(s, (*color, alpha), (center, center), radius)
+        return s
+
+    def batch(self, color_keys, kinds, xs, ys, radii, alphas, special_flags=0):
+        # Surface.blits sequence for many points at once; kinds index color_keys.
+        # Each distinct sprite is looked up once and shared by its points.
+        radius_keys = (radii * self.RADIUS_STEPS_PER_PIXEL + 0.5).astype(np.int64)
+        alpha_keys = alphas.astype(np.int64) // self.ALPHA_STEP
+        codes = (kinds * 4096 + radius_keys) * 256 + alpha_keys
+        unique, inverse = np.unique(codes, return_inverse=True)
+
+        sprites = np.empty(len(unique), dtype=object)
+        half = np.zeros(len(unique))
+        found = np.zeros(len(unique), dtype=bool)
+        for j, code in enumerate(unique.tolist()):
+            sprite = self.lookup((color_keys[code // (4096 * 256)], code // 256 % 4096, code % 256))
+            if sprite is not None:
+                sprites[j] = sprite
+                half[j] = sprite.get_width() / 2
+                found[j] = True
+
+        drawable = found[inverse]
+        inverse = inverse[drawable]
+        positions = np.stack((xs[drawable] - half[inverse], ys[drawable] - half[inverse]), axis=1)
+        return list(zip(sprites[inverse], positions.tolist(),
+                        itertools.repeat(None), itertools.repeat(special_flags)))
+
+    def draw(self, surface, color_key, radius, x, y, alpha=255):
+        sprite = self.get(color_key, radius, alpha)
+        if sprite is not None:
+            half = sprite.get_width() / 2
+            surface.blit(sprite, (x - half, y - half))
+
+sprite_cache = SpriteCache()
+spark_cache = SpriteCache(additive=True)
+
+# Struct-of-arrays particle store shared by every firework
+class ParticleStore:
+    # Longest trail any particle can keep; each slot owns a ring of this size
+    TRAIL_CAPACITY = 20
+
+    # Points drawn as glow sprites per frame, heads first and then the newest trail
+    # points; anything past this is added into the layer as a single pixel instead
+    SPRITE_BUDGET = 6000
+
+    # Column name -> (dtype, per-particle shape)
+    COLUMNS = {
+        'x': (np.float32, ()),
+        'y': (np.float32, ()),
+        'velocity_x': (np.float32, ()),
+        'velocity_y': (np.float32, ()),
+        'life': (np.float32, ()),
+        'radius': (np.float32, ()),
+        'original_radius': (np.float32, ()),
+        'decay_rate': (np.float32, ()),
+        'gravity': (np.float32, ()),
+        'color': (np.int16, (3,)),
+        'owner': (np.int64, ()),
+        'max_trail': (np.int16, ()),
+        'trail_length': (np.int16, ()),
+        'trail_head': (np.int16, ()),
+        'trail': (np.float32, (TRAIL_CAPACITY, 2)),
+    }
+
+    def __init__(self, capacity=65536):
+        self.capacity = capacity
+        self.count = 0
+        for name, (dtype, shape) in self.COLUMNS.items():
+            setattr(self, name, np.zeros((capacity, *shape), dtype))
+        # Layer-sized buffer the over-budget points are summed into
+        self.pixel_layer = None
+        self.pixel_buffer = None
+
+    def clear(self):
+        self.count = 0
+
+    def _grow(self, needed):
+        capacity = self.capacity
+        while capacity < needed:
+            capacity *= 2
+        for name, (dtype, shape) in self.COLUMNS.items():
+            column = np.zeros((capacity, *shape), dtype)
+            column[:self.count] = getattr(self, name)[:self.count]
+            setattr(self, name, column)
+        self.capacity = capacity
+
+    def spawn(self, x, y, color, velocity_x, velocity_y, radius, owner,
+              decay_rate=0.97, gravity=0.1, max_trail=10):
+        n = len(velocity_x)
+        if self.count + n > self.capacity:
+            self._grow(self.count + n)
+
+        new = slice(self.count, self.count + n)
+        self.x[new] = x
+        self.y[new] = y
+        self.color[new] = color
+        self.velocity_x[new] = velocity_x
+        self.velocity_y[new] = velocity_y
+        self.radius[new] = radius
+        self.original_radius[new] = radius
+        self.decay_rate[new] = decay_rate
+        self.gravity[new] = gravity
+        self.life[new] = 1.0
+        self.owner[new] = owner
+        self.max_trail[new] = max_trail
+        self.trail_length[new] = 0
+        self.trail_head[new] = 0
+        self.count += n
+
     def update(self):
-        self.velocity_y += self.gravity
-        self.x += self.velocity_x
-        self.y += self.velocity_y
-        self.life *= self.decay_rate
-        self.radius = self.original_radius * self.life
-        
-        # Add current position to trail
-        self.trail.append((self.x, self.y))
-        if len(self.trail) > self.max_trail:
-            self.trail.pop(0)
-            
+        n = self.count
+        if n == 0:
+            return
+
+        x, y = self.x[:n], self.y[:n]
+        velocity_y = self.velocity_y[:n]
+        life = self.life[:n]
+
+        velocity_y += self.gravity[:n]
+        x += self.velocity_x[:n]
+        y += velocity_y
+        life *= self.decay_rate[:n]
+        np.multiply(self.original_radius[:n], life, out=self.radius[:n])
+
+        # Write current position into each slot's trail ring
+        slots = np.arange(n)
+        head = self.trail_head[:n]
+        self.trail[slots, head, 0] = x
+        self.trail[slots, head, 1] = y
+        max_trail = self.max_trail[:n]
+        np.remainder(head + 1, max_trail, out=head)
+        np.minimum(self.trail_length[:n] + 1, max_trail, out=self.trail_length[:n])
+
+        # Drop burnt out particles by swap-remove: survivors from past the new
+        # live count are moved into the dead slots below it, nothing else moves
+        alive = (life >= 0.1) & (self.radius[:n] >= 0.1)
+        live_count = int(np.count_nonzero(alive))
+        if live_count < n:
+            holes = np.flatnonzero(~alive[:live_count])
+            movers = np.flatnonzero(alive[live_count:]) + live_count
+            for name in self.COLUMNS:
+                column = getattr(self, name)
+                column[holes] = column[movers]
+            self.count = live_count
+
+    def counts_by_owner(self, owner_count):
+        return np.bincount(self.owner[:self.count], minlength=owner_count)
+
+    def ordered_trails(self):
+        # Unroll every ring oldest point first, with each point's fade and validity;
+        # only as many steps as the longest live trail are unrolled
+        n = self.count
+        step = np.arange(self.trail_length[:n].max(initial=1))
+        length = self.trail_length[:n, None]
+        ring = (self.trail_head[:n, None] - length + step) % self.max_trail[:n, None]
+        points = self.trail[np.arange(n)[:, None], ring]
+        fade = step / np.maximum(length, 1)
+        return points, fade, step < length
+
     def draw(self, surface):
-        # Draw trail
-        for i, (trail_x, trail_y) in enumerate(self.trail):
-            alpha = int(255 * (i / len(self.trail)) * self.life
-            trail_color = (
-                min(255, self.color[0] + 50),
-                min(255, self.color[1] + 50),
-                min(255, self.color[2] + 50),
-                alpha
-            )
-            s = pygame.Surface((self.original_radius*2, self.original_radius*2), pygame.SRCALPHA)
-            pygame.draw.circle(s, trail_color, (self.original_radius, self.original_radius), 
-                              self.original_radius * (i / len(self.trail)))
-            surface.blit(s, (trail_x - self.original_radius, trail_y - self.original_radius))
-        
-        # Draw main particle
-        if self.radius > 0.1:
-            s = pygame.Surface((self.radius*2, self.radius*2), pygame.SRCALPHA)
-            pygame.draw.circle(s, self.color, (self.radius, self.radius), self.radius)
-            surface.blit(s, (self.x - self.radius, self.y - self.radius))
+        # Additively draw every firework's sparks as one batch into an accumulation layer
+        n = self.count
+        if n == 0:
+            return
+
+        # Trail points followed by the head as one more point per particle
+        points, fade, visible = self.ordered_trails()
+        xs = np.concatenate((points[..., 0], self.x[:n, None]), axis=1)
+        ys = np.concatenate((points[..., 1], self.y[:n, None]), axis=1)
+        radii = np.concatenate((self.original_radius[:n, None] * fade, self.radius[:n, None]), axis=1)
+        alphas = np.concatenate((255 * fade * self.life[:n, None], np.full((n, 1), 255.0)), axis=1)
+        visible = np.concatenate((visible, self.radius[:n, None] > 0.1), axis=1)
+        width = xs.shape[1]
+
+        flat = np.flatnonzero(visible)
+        if len(flat) == 0:
+            return
+        if len(flat) > self.SPRITE_BUDGET:
+            # Spend the sprite budget on heads (age 0), then on trail points from
+            # newest to oldest, by cutting the per-age counts at the budget
+            step = flat % width
+            age = np.where(step == width - 1, 0, self.trail_length[flat // width] - step)
+            taken = np.cumsum(np.bincount(age))
+            cutoff = int(np.searchsorted(taken, self.SPRITE_BUDGET, side='right'))
+            sprited = age < cutoff
+            spare = self.SPRITE_BUDGET - (int(taken[cutoff - 1]) if cutoff else 0)
+            sprited[np.flatnonzero(age == cutoff)[:spare]] = True
+            visible.ravel()[flat[sprited]] = False
+            self.draw_pixels(surface, visible, xs, ys, alphas)
+            flat = flat[sprited]
+
+        # Group the sprited points by the firework that owns them
+        rows = flat // width
+        order = np.argsort(self.owner[rows], kind='stable')
+        flat, rows = flat[order], rows[order]
+        owners = self.owner[rows]
+        starts = np.flatnonzero(np.r_[True, owners[1:] != owners[:-1]])
+        ends = np.r_[starts[1:], len(flat)]
+        kinds = (flat % width == width - 1).astype(np.int64)
+        xs, ys, radii, alphas = (column.ravel()[flat] for column in (xs, ys, radii, alphas))
+
+        for start, end in zip(starts.tolist(), ends.tolist()):
+            color = self.color[rows[start]]
+            color_keys = (spark_cache.color_key(color + 50), spark_cache.color_key(color))
+            batch = spark_cache.batch(color_keys, kinds[start:end], xs[start:end], ys[start:end],
+                                      radii[start:end], alphas[start:end], pygame.BLEND_ADD)
+            surface.blits(batch, doreturn=False)
+
+    def draw_pixels(self, surface, mask, xs, ys, alphas):
+        # Points over the sprite budget: sum their light per pixel in NumPy over the
+        # box they cover and add that box onto the layer with one blit
+        width, height = surface.get_size()
+        x = xs.astype(np.int32)
+        y = ys.astype(np.int32)
+        mask &= (x >= 0) & (x < width) & (y >= 0) & (y < height)
+        flat = np.flatnonzero(mask)
+        if len(flat) == 0:
+            return
+        x, y = x.ravel()[flat], y.ravel()[flat]
+        left, top = int(x.min()), int(y.min())
+        box = (int(x.max()) + 1 - left, int(y.max()) + 1 - top)
+        pixel = (x - left) * box[1] + (y - top)
+
+        # Per-row trail and head colours; trail points glow 50 brighter, as their sprites do
+        rows, step = np.divmod(flat, mask.shape[1])
+        key = 2 * rows + (step == mask.shape[1] - 1)
+        colors = np.stack((np.minimum(self.color[:len(mask)] + 50, 255), self.color[:len(mask)]), axis=1)
+        alpha = alphas.ravel()[flat] / 255
+
+        if self.pixel_layer is None or self.pixel_layer.get_size() != (width, height):
+            self.pixel_layer = pygame.Surface((width, height))
+            self.pixel_buffer = np.zeros((width, height, 3), np.uint8)
+        buffer = self.pixel_buffer[:box[0], :box[1]]
+        for c in range(3):
+            total = np.bincount(pixel, colors[..., c].ravel()[key] * alpha, minlength=box[0] * box[1])
+            buffer[..., c] = np.minimum(total, 255).reshape(box)
+        area = pygame.Rect(0, 0, *box)
+        pygame.surfarray.blit_array(self.pixel_layer.subsurface(area), buffer)
+        surface.blit(self.pixel_layer, (left, top), area, special_flags=pygame.BLEND_ADD)
+
+particles = ParticleStore()
+
+# Explosion patterns as data. Each shell takes a share of the burst's particles and
+# either spreads them evenly over a number of turns or scatters them at random.
+# Speeds and radii are drawn from their ranges, or ramped along the shell.
+EXPLOSION_PATTERNS = {
+    "circle": [
+        {"spread": "random", "speed": (1, 5), "radius": (1, 3)},
+    ],
+    "ring": [
+        {"spread": "even", "speed": (2, 3), "radius": (1, 2)},
+    ],
+    "willow": [
+        {"spread": "random", "speed": (1, 3), "radius": (1, 2),
+         "decay_rate": 0.98, "gravity": 0.05, "max_trail": 20},
+    ],
+    "double_ring": [
+        {"spread": "even", "share": 0.5, "speed": (1, 2), "radius": (1, 2)},
+        {"spread": "even", "share": 0.5, "speed": (3, 4), "radius": (1, 2)},
+    ],
+    "spiral": [
+        {"spread": "even", "turns": 2, "speed": (0, 5), "speed_ramp": True, "radius": (1, 2),
+         "decay_rate": 0.96},
+    ],
+}
+
+# Unit vectors a burst picks its particle directions from
+DIRECTION_STEPS = 4096
+DIRECTION_ANGLES = np.arange(DIRECTION_STEPS) / DIRECTION_STEPS * math.pi * 2
+DIRECTIONS = np.stack((np.cos(DIRECTION_ANGLES), np.sin(DIRECTION_ANGLES)), axis=1)
+
+# One explosion pattern compiled for a fixed particle count
+class ExplosionTemplate:
+    def __init__(self, shells, particle_count):
+        columns = {name: [] for name in (
+            'direction', 'direction_jitter', 'speed_base', 'speed_span',
+            'radius_base', 'radius_span', 'decay_rate', 'gravity', 'max_trail')}
+
+        for shell in shells:
+            n = int(particle_count * shell.get("share", 1.0))
+            step = np.arange(n) / max(n, 1)
+            speed_low, speed_high = shell["speed"]
+            radius_low, radius_high = shell["radius"]
+
+            if shell["spread"] == "even":
+                columns['direction'].append((step * shell.get("turns", 1) * DIRECTION_STEPS).astype(np.int64))
+                columns['direction_jitter'].append(np.zeros(n))
+            else:
+                columns['direction'].append(np.zeros(n, np.int64))
+                columns['direction_jitter'].append(np.full(n, float(DIRECTION_STEPS)))
+
+            if shell.get("speed_ramp"):
+                columns['speed_base'].append(speed_low + step * (speed_high - speed_low))
+                columns['speed_span'].append(np.zeros(n))
+            else:
+                columns['speed_base'].append(np.full(n, float(speed_low)))
+                columns['speed_span'].append(np.full(n, float(speed_high - speed_low)))
+
+            columns['radius_base'].append(np.full(n, float(radius_low)))
+            columns['radius_span'].append(np.full(n, float(radius_high - radius_low)))
+            columns['decay_rate'].append(np.full(n, shell.get("decay_rate", 0.97)))
+            columns['gravity'].append(np.full(n, shell.get("gravity", 0.1)))
+            # Trails live in fixed rings, so a shell can't keep more than fits in one
+            max_trail = shell.get("max_trail", 10)
+            if not 1 <= max_trail <= ParticleStore.TRAIL_CAPACITY:
+                raise ValueError(f"max_trail must be between 1 and {ParticleStore.TRAIL_CAPACITY}, got {max_trail}")
+            columns['max_trail'].append(np.full(n, max_trail))
+
+        for name, parts in columns.items():
+            setattr(self, name, np.concatenate(parts))
+        self.count = len(self.direction)
+
+    def burst(self, x, y, color, owner):
+        # Scale and jitter the template, then copy it into the particle store
+        jitter = rng.random((2, self.count))
+        direction = (self.direction + (jitter[0] * self.direction_jitter).astype(np.int64)) % DIRECTION_STEPS
+        speed = self.speed_base + self.speed_span * jitter[1]
+        velocity = DIRECTIONS[direction] * speed[:, None]
+        radius = self.radius_base + self.radius_span * rng.random(self.count)
+
+        particles.spawn(
+            x, y,
+            color, velocity[:, 0], velocity[:, 1],
+            radius, owner,
+            decay_rate=self.decay_rate, gravity=self.gravity, max_trail=self.max_trail
+        )
+        return self.count
+
+# Every pattern compiled once for every particle count a burst can have
+explosion_templates = {
+    (name, particle_count): ExplosionTemplate(shells, particle_count)
+    for name, shells in EXPLOSION_PATTERNS.items()
+    for particle_count in range(50, 201)
+}
 
 # Firework class
 class Firework:
-    def __init__(self, x, y, color=None):
+    def __init__(self, x, y, color=None, slot=0):
+        # Slot doubles as the owner id of this firework's sparks
+        self.slot = slot
+        self.reset(x, y, color)
+
+    def reset(self, x, y, color=None):
         self.x = x
         self.y = y
         self.color = color or (
@@ -78,13 +440,14 @@ class Firework:
             random.randint(100, 255),
             random.randint(100, 255)
         )
-        self.particles = []
+        self.particle_count = 0
         self.exploded = False
         self.velocity_y = random.uniform(-12, -8)
         self.radius = 3
         self.gravity = 0.1
         
     def update(self):
+        # Exploded sparks are advanced by the shared particle store
         if not self.exploded:
             self.velocity_y += self.gravity
             self.y += self.velocity_y
@@ -92,94 +455,14 @@ class Firework:
             # Random chance to explode
             if self.velocity_y >= 0 or random.random() < 0.02:
                 self.explode()
-        else:
-            # Update particles
-            for particle in self.particles[:]:
-                particle.update()
-                if particle.life < 0.1 or particle.radius < 0.1:
-                    self.particles.remove(particle)
                     
     def explode(self):
         self.exploded = True
-        explosion_type = random.choice(["circle", "ring", "willow", "double_ring", "spiral"])
+        explosion_type = random.choice(list(EXPLOSION_PATTERNS))
         particle_count = random.randint(50, 200)
-        
-        if explosion_type == "circle":
-            for _ in range(particle_count):
-                angle = random.uniform(0, math.pi * 2)
-                speed = random.uniform(1, 5)
-                vx = math.cos(angle) * speed
-                vy = math.sin(angle) * speed
-                self.particles.append(Particle(
-                    self.x, self.y, 
-                    self.color, vx, vy, 
-                    random.uniform(1, 3)
-                )
-                
-        elif explosion_type == "ring":
-            for i in range(particle_count):
-                angle = (i / particle_count) * math.pi * 2
-                speed = random.uniform(2, 3)
-                vx = math.cos(angle) * speed
-                vy = math.sin(angle) * speed
-                self.particles.append(Particle(
-                    self.x, self.y, 
-                    self.color, vx, vy, 
-                    random.uniform(1, 2)
-                )
-                
-        elif explosion_type == "willow":
-            for _ in range(particle_count):
-                angle = random.uniform(0, math.pi * 2)
-                speed = random.uniform(1, 3)
-                vx = math.cos(angle) * speed
-                vy = math.sin(angle) * speed
-                particle = Particle(
-                    self.x, self.y, 
-                    self.color, vx, vy, 
-                    random.uniform(1, 2),
-                    decay_rate=0.98,
-                    gravity=0.05
-                )
-                particle.max_trail = 20
-                self.particles.append(particle)
-                
-        elif explosion_type == "double_ring":
-            for i in range(particle_count//2):
-                angle = (i / (particle_count//2)) * math.pi * 2
-                speed1 = random.uniform(1, 2)
-                speed2 = random.uniform(3, 4)
-                
-                # Inner ring
-                vx1 = math.cos(angle) * speed1
-                vy1 = math.sin(angle) * speed1
-                self.particles.append(Particle(
-                    self.x, self.y, 
-                    self.color, vx1, vy1, 
-                    random.uniform(1, 2)
-                )
-                
-                # Outer ring
-                vx2 = math.cos(angle) * speed2
-                vy2 = math.sin(angle) * speed2
-                self.particles.append(Particle(
-                    self.x, self.y, 
-                    self.color, vx2, vy2, 
-                    random.uniform(1, 2)
-                )
-                
-        elif explosion_type == "spiral":
-            for i in range(particle_count):
-                angle = (i / particle_count) * math.pi * 4
-                radius = (i / particle_count) * 5
-                vx = math.cos(angle) * radius
-                vy = math.sin(angle) * radius
-                self.particles.append(Particle(
-                    self.x, self.y, 
-                    self.color, vx, vy, 
-                    random.uniform(1, 2),
-                    decay_rate=0.96
-                )
+        self.particle_count = explosion_templates[explosion_type, particle_count].burst(
+            self.x, self.y, self.color, self.slot
+        )
     
     def draw(self, surface):
         if not self.exploded:
@@ -190,14 +473,46 @@ class Firework:
             for i in range(5):
                 trail_y = self.y + i * 3
                 alpha = 255 - i * 50
-                trail_color = (*self.color, alpha)
-                s = pygame.Surface((4, 4), pygame.SRCALPHA)
-                pygame.draw.circle(s, trail_color, (2, 2), 2 - i * 0.3)
-                surface.blit(s, (self.x - 2, trail_y - 2))
+                sprite_cache.draw(surface, sprite_cache.color_key(self.color), 2 - i * 0.3,
+                                  self.x, trail_y, alpha)
+
+# Pool that recycles Firework objects and their particle owner slots
+class FireworkPool:
+    def __init__(self):
+        self.slots = []
+        self.free = []
+        self.active = []
+
+    def launch(self, x, y, color=None):
+        if self.free:
+            firework = self.free.pop()
+            firework.reset(x, y, color)
         else:
-            # Draw particles
-            for particle in self.particles:
-                particle.draw(surface)
+            firework = Firework(x, y, color, slot=len(self.slots))
+            self.slots.append(firework)
+        self.active.append(firework)
+        return firework
+
+    def update(self):
+        for firework in self.active:
+            firework.update()
+
+        live_counts = particles.counts_by_owner(len(self.slots))
+        i = 0
+        while i < len(self.active):
+            firework = self.active[i]
+            firework.particle_count = int(live_counts[firework.slot])
+            
+            # Retire finished fireworks by swapping the last active one into place
+            if firework.exploded and firework.particle_count == 0:
+                self.active[i] = self.active[-1]
+                self.active.pop()
+                self.free.append(firework)
+            else:
+                i += 1
+
+    def __len__(self):
+        return len(self.active)
 
 # Building class for cityscape
 class Building:
@@ -218,11 +533,6 @@ class Building:
                         'flicker_speed': random.uniform(0.01, 0.05)
                     })
     
-    def update(self):
-        # Update window brightness
-        for window in self.windows:
-            window['brightness'] = 0.5 + 0.5 * math.sin(pygame.time.get_ticks() * window['flicker_speed'])
-            
     def draw(self, surface):
         # Draw building
         pygame.draw.rect(surface, BUILDING_COLOR, (self.x, HEIGHT - self.height, self.width, self.height))
@@ -237,117 +547,253 @@ class Building:
             )
             pygame.draw.rect(surface, color, (window['x'], window['y'], 8, 12))
 
-# Create cityscape
-buildings = []
-for i in range(20):
-    x = i * 50 + random.randint(-10, 10)
-    width = random.randint(30, 70)
-    height = random.randint(100, 400)
-    buildings.append(Building(x, width, height))
-
-# Create mountains in background
-mountains = []
-for i in range(10):
-    x = i * 200 - 100
-    height = random.randint(50, 150)
-    mountains.append((x, HEIGHT - height, 200, height))
-
-# Create water reflection
-water_surface = pygame.Surface((WIDTH, 100), pygame.SRCALPHA)
-
-# Create initial fireworks
-fireworks = []
-
-# Main loop
-clock = pygame.time.Clock()
-running = True
-
-while running:
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-        elif event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_ESCAPE:
-                running = False
-        elif event.type == pygame.MOUSEBUTTONDOWN:
-            # Create firework at mouse position
-            fireworks.append(Firework(event.pos[0], event.pos[1]))
-    
-    # Randomly generate new fireworks
-    if random.random() < 0.05 and len(fireworks) < 10:
-        fireworks.append(Firework(random.randint(100, WIDTH-100), random.randint(100, HEIGHT//2)))
-    
-    # Fill the screen with night blue
-    screen.fill(NIGHT_BLUE)
-    
-    # Draw stars
-    for _ in range(100):
-        x = random.randint(0, WIDTH)
-        y = random.randint(0, HEIGHT//2)
-        brightness = random.uniform(0.3, 1.0)
-        size = random.uniform(0.5, 2)
-        pygame.draw.circle(screen, 
-                          (int(255 * brightness), int(255 * brightness), int(255 * brightness)), 
-                          (x, y), size)
-    
-    # Draw mountains
-    for mountain in mountains:
-        pygame.draw.rect(screen, MOUNTAIN_COLOR, mountain)
-        # Add some mountain details
-        pygame.draw.line(screen, (10, 15, 30), 
-                         (mountain[0], mountain[1]), 
-                         (mountain[0] + mountain[2], mountain[1]), 3)
-    
-    # Draw water surface
-    water_surface.fill((0, 0, 0, 0))
-    pygame.draw.rect(water_surface, WATER_COLOR, (0, 0, WIDTH, 100))
-    
-    # Add water highlights
-    for _ in range(20):
-        x = random.randint(0, WIDTH)
-        width = random.randint(20, 100)
-        pygame.draw.ellipse(water_surface, WATER_HIGHLIGHT, (x, random.randint(0, 20), width, 5))
-    
-    screen.blit(water_surface, (0, HEIGHT - 100))
-    
-    # Update and draw buildings
-    for building in buildings:
-        building.update()
-        building.draw(screen)
-    
-    # Update and draw fireworks
-    for firework in fireworks[:]:
-        firework.update()
-        firework.draw(screen)
-        
-        # Remove finished fireworks
-        if firework.exploded and len(firework.particles) == 0:
-            fireworks.remove(firework)
-    
-    # Draw water reflection of fireworks
-    for firework in fireworks:
-        if firework.exploded:
-            for particle in firework.particles:
-                # Only reflect particles near the water
-                if particle.y > HEIGHT - 150:
-                    # Draw reflection
-                    reflection_y = HEIGHT - (particle.y - (HEIGHT - 150))
-                    alpha = min(255, int(255 * (1 - (reflection_y - (HEIGHT - 150)) / 150))
-                    
-                    if alpha > 10:
-                        # Draw particle reflection
-                        s = pygame.Surface((particle.radius*2, particle.radius*2), pygame.SRCALPHA)
-                        pygame.draw.circle(s, (*particle.color[:3], alpha//2), 
-                                          (particle.radius, particle.radius), particle.radius)
-                        screen.blit(s, (particle.x - particle.radius, reflection_y - particle.radius))
-    
+# Cityscape rasterized once; flickering windows are repainted only when they change
+class Skyline:
+    BRIGHTNESS_LEVELS = 16
+
+    def __init__(self, buildings):
+        self.top = HEIGHT - max(building.height for building in buildings)
+        self.layer = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
+        for building in buildings:
+            building.draw(self.layer)
+
+        # Everything drawn on the layer, in draw order: (rect, window index or None)
+        items = []
+        windows = []
+        for building in buildings:
+            items.append((pygame.Rect(building.x, HEIGHT - building.height, building.width, building.height), None))
+            for window in building.windows:
+                items.append((pygame.Rect(window['x'], window['y'], 8, 12), len(windows)))
+                windows.append(window)
+
+        # For every window, the items painted over its rect from itself onwards
+        self.window_rects = []
+        self.repaint_lists = []
+        rects = [rect for rect, _ in items]
+        for position, (rect, window) in enumerate(items):
+            if window is not None:
+                self.window_rects.append(rect)
+                self.repaint_lists.append([items[position + j] for j in rect.collidelistall(rects[position:])])
+
+        self.flicker_speed = np.array([window['flicker_speed'] for window in windows])
+        self.level = np.full(len(windows), -1)
+        self.level_colors = [
+            tuple(int(c * level / (self.BRIGHTNESS_LEVELS - 1)) for c in BUILDING_WINDOW)
+            for level in range(self.BRIGHTNESS_LEVELS)
+        ]
+
+    def update(self, ticks):
+        # Window brightness for the whole city from one time sample
+        brightness = 0.5 + 0.5 * np.sin(ticks * self.flicker_speed)
+        level = (brightness * (self.BRIGHTNESS_LEVELS - 1) + 0.5).astype(int)
+        changed = np.flatnonzero(level != self.level)
+        self.level = level
+
+        levels = level.tolist()
+        for i in changed.tolist():
+            self.layer.set_clip(self.window_rects[i])
+            for rect, window in self.repaint_lists[i]:
+                color = BUILDING_COLOR if window is None else self.level_colors[levels[window]]
+                self.layer.fill(color, rect)
+        self.layer.set_clip(None)
+
+    def draw(self, surface):
+        surface.blit(self.layer, (0, self.top), (0, self.top, WIDTH, HEIGHT - self.top))
+
+# Persistent star field; a few stars per frame are re-shaded from a twinkle table
+class StarField:
+    TWINKLE_STEPS = 64
+    TWINKLES_PER_FRAME = 8
+
+    def __init__(self, count, seed):
+        star_rng = np.random.default_rng(seed)
+        self.x = star_rng.integers(0, WIDTH, count, endpoint=True)
+        self.y = star_rng.integers(0, HEIGHT//2, count, endpoint=True)
+        self.brightness = star_rng.uniform(0.3, 1.0, count)
+        self.size = star_rng.uniform(0.5, 2, count)
+        self.phase = star_rng.integers(0, self.TWINKLE_STEPS, count)
+        self.shade = self.brightness.copy()
+        self.frame = 0
+        self.next_star = 0
+
+        # Brightness multiplier over one twinkle cycle
+        steps = np.arange(self.TWINKLE_STEPS) / self.TWINKLE_STEPS
+        self.twinkle_table = 0.75 + 0.25 * np.sin(steps * math.pi * 2)
+
+        # Each star's bounding rect and the stars it overlaps, itself included
+        self.rects = [
+            pygame.Rect(x - 3, y - 3, 7, 7) for x, y in zip(self.x.tolist(), self.y.tolist())
+        ]
+        self.neighbors = [rect.collidelistall(self.rects) for rect in self.rects]
+
+    def draw_star(self, surface, i):
+        level = int(255 * self.shade[i])
+        pygame.draw.circle(surface, (level, level, level),
+                           (int(self.x[i]), int(self.y[i])), float(self.size[i]))
+
+    def draw(self, surface):
+        for i in range(len(self.rects)):
+            self.draw_star(surface, i)
+
+    def twinkle(self, surface):
+        # Re-shade the next few stars in turn and repaint just their rects
+        picks = (self.next_star + np.arange(self.TWINKLES_PER_FRAME)) % len(self.rects)
+        self.next_star = int(picks[-1]) + 1
+        self.frame += 1
+        steps = (self.frame // 4 + self.phase[picks]) % self.TWINKLE_STEPS
+        self.shade[picks] = self.brightness[picks] * self.twinkle_table[steps]
+
+        for i in picks.tolist():
+            surface.set_clip(self.rects[i])
+            surface.fill(NIGHT_BLUE)
+            for j in self.neighbors[i]:
+                self.draw_star(surface, j)
+        surface.set_clip(None)
+
+# Fonts resolved once and rendered text memoized by (font, text, color)
+class TextCache:
+    def __init__(self):
+        self.fonts = {}
+        self.texts = {}
+        self.live = {}
+
+    def font(self, name, size, bold=False):
+        key = (name, size, bold)
+        font = self.fonts.get(key)
+        if font is None:
+            font = self.fonts[key] = pygame.font.SysFont(name, size, bold=bold)
+        return font
+
+    def render(self, font, text, color):
+        key = (font, text, color)
+        rendered = self.texts.get(key)
+        if rendered is None:
+            rendered = self.texts[key] = font.render(text, True, color)
+        return rendered
+
+    def render_live(self, slot, font, text, color):
+        # Text that changes over time keeps only its latest rendering
+        cached = self.live.get(slot)
+        if cached is None or cached[0] != text:
+            cached = self.live[slot] = (text, font.render(text, True, color))
+        return cached[1]
+
+# Water reflection mirrored from the strip of the particle layer above the waterline
+class Reflection:
+    def __init__(self, height):
+        self.rect = pygame.Rect(0, HEIGHT - height, WIDTH, height)
+
+        # Intensity fades from half strength at the top of the strip to nothing at the bottom
+        self.mask = pygame.Surface(self.rect.size)
+        for row in range(height):
+            level = int(255 * (1 - row / height)) // 2
+            self.mask.fill((level, level, level), (0, row, WIDTH, 1))
+
+    def draw(self, surface, layer):
+        reflection = pygame.transform.flip(layer.subsurface(self.rect), False, True)
+        reflection.blit(self.mask, (0, 0), special_flags=pygame.BLEND_MULT)
+        surface.blit(reflection, self.rect, special_flags=pygame.BLEND_ADD)
+
+# Everything on screen apart from the HUD
+class Scene:
+    def __init__(self):
+        # Start every run from empty particle and sprite state
+        particles.clear()
+        sprite_cache.clear()
+        spark_cache.clear()
+
+        # Create cityscape
+        buildings = []
+        for i in range(20):
+            x = i * 50 + random.randint(-10, 10)
+            width = random.randint(30, 70)
+            height = random.randint(100, 400)
+            buildings.append(Building(x, width, height))
+
+        # Create mountains in background
+        mountains = []
+        for i in range(10):
+            x = i * 200 - 100
+            height = random.randint(50, 150)
+            mountains.append((x, HEIGHT - height, 200, height))
+
+        # Rasterize the static sky, stars and mountains once
+        self.stars = StarField(100, STAR_SEED)
+        self.background = pygame.Surface((WIDTH, HEIGHT))
+        self.background.fill(NIGHT_BLUE)
+        self.stars.draw(self.background)
+        for mountain in mountains:
+            pygame.draw.rect(self.background, MOUNTAIN_COLOR, mountain)
+            # Add some mountain details
+            pygame.draw.line(self.background, (10, 15, 30), 
+                             (mountain[0], mountain[1]), 
+                             (mountain[0] + mountain[2], mountain[1]), 3)
+
+        self.skyline = Skyline(buildings)
+
+        # Create water reflection
+        self.water_surface = pygame.Surface((WIDTH, 100), pygame.SRCALPHA)
+        self.reflection = Reflection(150)
+
+        # Additive accumulation layer all sparks are drawn into before compositing
+        self.particle_layer = pygame.Surface((WIDTH, HEIGHT))
+
+        # Create initial fireworks
+        self.fireworks = FireworkPool()
+
+    def update(self, ticks, auto_launch=True):
+        # Randomly generate new fireworks
+        if auto_launch and random.random() < 0.05 and len(self.fireworks) < 10:
+            self.fireworks.launch(random.randint(100, WIDTH-100), random.randint(100, HEIGHT//2))
+
+        # Twinkle a few stars and windows on the cached layers
+        self.stars.twinkle(self.background)
+        self.skyline.update(ticks)
+
+        # Update sparks of every exploded firework in one step
+        particles.update()
+
+        # Update fireworks, retiring finished ones to the pool
+        self.fireworks.update()
+
+    def draw(self, surface):
+        # Draw cached sky, stars and mountains
+        surface.blit(self.background, (0, 0))
+
+        # Draw water surface
+        self.water_surface.fill((0, 0, 0, 0))
+        pygame.draw.rect(self.water_surface, WATER_COLOR, (0, 0, WIDTH, 100))
+
+        # Add water highlights
+        for _ in range(20):
+            x = random.randint(0, WIDTH)
+            width = random.randint(20, 100)
+            pygame.draw.ellipse(self.water_surface, WATER_HIGHLIGHT, (x, random.randint(0, 20), width, 5))
+
+        surface.blit(self.water_surface, (0, HEIGHT - 100))
+
+        # Draw buildings
+        self.skyline.draw(surface)
+
+        # Draw fireworks
+        for firework in self.fireworks.active:
+            firework.draw(surface)
+
+        self.particle_layer.fill((0, 0, 0))
+        particles.draw(self.particle_layer)
+        surface.blit(self.particle_layer, (0, 0), special_flags=pygame.BLEND_ADD)
+
+        # Draw water reflection of fireworks
+        self.reflection.draw(surface, self.particle_layer)
+
+def draw_hud(surface, text_cache, active_fireworks):
     # Draw title
-    title_font = pygame.font.SysFont('arial', 36, bold=True)
-    title = title_font.render("Interactive Fireworks Simulator", True, (255, 255, 200))
-    screen.blit(title, (WIDTH//2 - title.get_width()//2, 20))
+    title_font = text_cache.font('arial', 36, bold=True)
+    title = text_cache.render(title_font, "Interactive Fireworks Simulator", (255, 255, 200))
+    surface.blit(title, (WIDTH//2 - title.get_width()//2, 20))
     
     # Draw instructions
-    instr_font = pygame.font.SysFont('arial', 16)
+    instr_font = text_cache.font('arial', 16)
     instructions = [
         "Click anywhere to launch a firework",
         "Fireworks automatically generate",
@@ -355,20 +801,107 @@ while running:
     ]
     
     for i, text in enumerate(instructions):
-        rendered = instr_font.render(text, True, (200, 230, 255))
-        screen.blit(rendered, (WIDTH//2 - rendered.get_width()//2, 70 + i*25))
+        rendered = text_cache.render(instr_font, text, (200, 230, 255))
+        surface.blit(rendered, (WIDTH//2 - rendered.get_width()//2, 70 + i*25))
     
     # Draw firework counter
-    count_text = instr_font.render(f"Active Fireworks: {len(fireworks)}", True, (255, 255, 200))
-    screen.blit(count_text, (20, HEIGHT - 30))
+    count_text = text_cache.render_live("firework_count", instr_font,
+                                        f"Active Fireworks: {active_fireworks}", (255, 255, 200))
+    surface.blit(count_text, (20, HEIGHT - 30))
     
     # Draw type counter
-    types = ["Circle", "Ring", "Willow", "Double Ring", "Spiral"]
-    type_text = instr_font.render("Firework Types: " + ", ".join(types), True, (200, 230, 255))
-    screen.blit(type_text, (WIDTH - type_text.get_width() - 20, HEIGHT - 30))
-    
-    pygame.display.flip()
-    clock.tick(60)
+    types = [name.replace("_", " ").title() for name in EXPLOSION_PATTERNS]
+    type_text = text_cache.render(instr_font, "Firework Types: " + ", ".join(types), (200, 230, 255))
+    surface.blit(type_text, (WIDTH - type_text.get_width() - 20, HEIGHT - 30))
+
+def init_display():
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("Interactive Fireworks Simulator")
+    return screen
+
+def init_session():
+    # Display, scene and text cache for one run; fonts belong to the pygame
+    # session, so every run builds its own text cache
+    screen = init_display()
+    return screen, Scene(), TextCache()
+
+def main():
+    screen, scene, text_cache = init_session()
+
+    # Main loop
+    clock = pygame.time.Clock()
+    running = True
+
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE:
+                    running = False
+            elif event.type == pygame.MOUSEBUTTONDOWN:
+                # Create firework at mouse position
+                scene.fireworks.launch(event.pos[0], event.pos[1])
+
+        scene.update(pygame.time.get_ticks())
+        scene.draw(screen)
+        draw_hud(screen, text_cache, len(scene.fireworks))
+
+        pygame.display.flip()
+        clock.tick(FPS)
+
+    pygame.quit()
+
+def benchmark(frames=600, launches_per_second=5, seed=0):
+    # Headless, seeded and unthrottled run with a scripted launch schedule
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    seed_random(seed)
+    screen, scene, text_cache = init_session()
+
+    timings = {"update": [], "draw": [], "flip": []}
+    peak_particles = 0
+
+    for frame in range(frames):
+        pygame.event.pump()
+
+        # Launches spread evenly over each simulated second
+        launches = int((frame + 1) * launches_per_second / FPS) - int(frame * launches_per_second / FPS)
+        for _ in range(launches):
+            scene.fireworks.launch(random.randint(100, WIDTH-100), random.randint(100, HEIGHT//2))
+
+        start = time.perf_counter()
+        scene.update(frame * 1000 / FPS, auto_launch=False)
+        updated = time.perf_counter()
+        scene.draw(screen)
+        draw_hud(screen, text_cache, len(scene.fireworks))
+        drawn = time.perf_counter()
+        pygame.display.flip()
+        flipped = time.perf_counter()
+
+        timings["update"].append(updated - start)
+        timings["draw"].append(drawn - updated)
+        timings["flip"].append(flipped - drawn)
+        peak_particles = max(peak_particles, particles.count)
+
+    pygame.quit()
+
+    for phase, samples in timings.items():
+        p50, p95, p99 = np.percentile(np.array(samples) * 1000, [50, 95, 99])
+        print(f"{phase:<6}  p50 {p50:8.3f} ms  p95 {p95:8.3f} ms  p99 {p99:8.3f} ms")
+    print(f"peak particles: {peak_particles}")
+    return timings, peak_particles
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Interactive Fireworks Simulator")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="run headless with a fixed seed and print frame timings")
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--rate", type=float, default=5, help="fireworks launched per second")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
 
-pygame.quit()
-sys.exit()
\ No newline at end of file
+    if args.benchmark:
+        benchmark(args.frames, args.rate, args.seed)
+    else:
+        main()
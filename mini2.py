@@ -1,7 +1,13 @@
 import pygame
+import numpy as np
 import sys
+import os
+import json
+import struct
 import random
 import math
+import itertools
+from concurrent.futures import ThreadPoolExecutor
 from pygame.locals import *
 
 # Initialize pygame
@@ -38,6 +44,17 @@ LENGTH_DECREASE = 0.75
 MIN_BRANCH_LENGTH = 8
 LEAF_SIZE = 5
 MAX_BRANCHES = 3
+MAX_TREE_BRANCHES = 2000  # Branch budget that bounds generation time and memory
+
+# Saved tree files: magic, version and JSON header length, the JSON header, then
+# the packed arrays, each starting on an ARRAY_ALIGN boundary so they can be mapped
+TREE_MAGIC = b'TREE'
+TREE_FORMAT_VERSION = 1
+TREE_PREAMBLE = struct.Struct('<4sHI')
+TREE_ARRAYS = ('branch_start', 'branch_end', 'branch_thickness', 'branch_depth',
+               'leaves', 'bark_counts', 'bark', 'bark_radius')
+ARRAY_ALIGN = 64
+TREE_LIBRARY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'trees')
 
 # Animation variables
 current_season = 0
@@ -47,202 +64,503 @@ wind_direction = 0
 wind_strength = 0
 wind_change_timer = 0
 leaf_fall_timer = 0
-falling_leaves = []
+
+# Random source for per-frame effects
+rng = np.random.default_rng()
+
+# Sprite sheet with one row per leaf color: a round leaf, then autumn ellipses by size
+class LeafSprites:
+    CELL = 12
+    ELLIPSE_SIZES = np.linspace(3, 6, 7)
+
+    def __init__(self):
+        self.colors = [color for palette in LEAF_COLORS for color in palette]
+        columns = 1 + len(self.ELLIPSE_SIZES)
+        self.sheet = pygame.Surface((columns * self.CELL, len(self.colors) * self.CELL), pygame.SRCALPHA)
+        self.areas = []
+        for row, color in enumerate(self.colors):
+            top = row * self.CELL
+            pygame.draw.circle(self.sheet, color, (self.CELL // 2, top + self.CELL // 2), LEAF_SIZE)
+            for column, size in enumerate(self.ELLIPSE_SIZES.tolist(), 1):
+                pygame.draw.ellipse(self.sheet, color, (column * self.CELL, top, size, size * 1.5))
+            self.areas.extend(
+                pygame.Rect(column * self.CELL, top, self.CELL, self.CELL) for column in range(columns))
+        
+        # Offset from a leaf's position to its sprite's top left corner, per column
+        self.offsets = np.array([self.CELL // 2] + [int(size / 2) for size in self.ELLIPSE_SIZES])
+        self.columns = columns
+
+    def sprite(self, color_index, column):
+        return color_index * self.columns + column
+
+    def ellipse_column(self, size):
+        return 1 + np.abs(np.asarray(size)[..., None] - self.ELLIPSE_SIZES).argmin(axis=-1)
+
+leaf_sprites = LeafSprites()
 
 class Tree:
-    def __init__(self, x, y, trunk_length, trunk_thickness, angle=math.pi/2):
+    def __init__(self, x, y, trunk_length, trunk_thickness, angle=math.pi/2,
+                 seed=None, max_branches=MAX_TREE_BRANCHES, season=0):
         self.x = x
         self.y = y
         self.trunk_length = trunk_length
         self.trunk_thickness = trunk_thickness
         self.angle = angle
-        self.branches = []
-        self.leaves = []
-        self.grow_tree(self.x, self.y, self.trunk_length, self.angle, self.trunk_thickness, 0)
-    
-    def grow_tree(self, start_x, start_y, length, angle, thickness, depth):
-        if depth > MAX_DEPTH or length < MIN_BRANCH_LENGTH:
-            # Create a cluster of leaves at the branch end
-            for _ in range(random.randint(8, 15)):
-                offset_x = random.uniform(-15, 15)
-                offset_y = random.uniform(-15, 5)
-                self.leaves.append((start_x + offset_x, start_y + offset_y))
-            return
+        self.seed = seed if seed is not None else random.randrange(2**32)
+        self.max_branches = max_branches
+        self.grow_tree()
+        self.render_layers()
+        self.set_season(season)
+    
+    def grow_tree(self):
+        rng = np.random.default_rng(self.seed)
         
-        # Calculate end point of branch
-        end_x = start_x + math.cos(angle) * length
-        end_y = start_y - math.sin(angle) * length
+        # Branches still to grow, one whole depth level at a time
+        start = np.array([[self.x, self.y]], dtype=float)
+        length = np.array([float(self.trunk_length)])
+        angle = np.array([float(self.angle)])
+        thickness = float(self.trunk_thickness)
+        budget = self.max_branches
         
-        # Store branch data
-        self.branches.append({
-            'start': (start_x, start_y),
-            'end': (end_x, end_y),
-            'thickness': thickness,
-            'depth': depth
-        })
+        levels = []
+        tips = []
+        for depth in range(MAX_DEPTH + 2):
+            # Branches past the depth limit, too short or over budget end in leaves
+            growing = length >= MIN_BRANCH_LENGTH
+            if depth > MAX_DEPTH:
+                growing[:] = False
+            candidates = np.flatnonzero(growing)
+            if len(candidates) > budget:
+                growing[:] = False
+                growing[rng.choice(candidates, budget, replace=False)] = True
+            
+            tips.append(start[~growing])
+            start, length, angle = start[growing], length[growing], angle[growing]
+            count = len(start)
+            if count == 0:
+                break
+            budget -= count
+            
+            # Calculate end points of this level's branches
+            end = start + np.stack((np.cos(angle), -np.sin(angle)), axis=1) * length[:, None]
+            levels.append((start, end, thickness, depth))
+            
+            new_thickness = max(1, thickness * 0.75)
+            new_length = np.maximum(MIN_BRANCH_LENGTH, length * LENGTH_DECREASE * rng.uniform(0.8, 1.0, count))
+            
+            # Additional branches (1-3 per node), alternating sides
+            side_counts = rng.integers(1, MAX_BRANCHES, count, endpoint=True)
+            parent = np.repeat(np.arange(count), side_counts)
+            side_index = np.arange(len(parent)) - np.repeat(np.cumsum(side_counts) - side_counts, side_counts)
+            side = np.where(side_index % 2 == 0, 1, -1)
+            side_angle = angle[parent] + ANGLE_VARIATION * rng.uniform(0.5, 1.5, len(parent)) * side
+            side_length = new_length[parent] * rng.uniform(0.5, 0.8, len(parent))
+            
+            # Main branch continuation followed by the side branches
+            start = np.concatenate((end, end[parent]))
+            length = np.concatenate((new_length, side_length))
+            angle = np.concatenate((angle, side_angle))
+            thickness = new_thickness
         
-        # Recursively grow new branches
-        new_thickness = max(1, thickness * 0.75)
-        new_length = max(MIN_BRANCH_LENGTH, length * LENGTH_DECREASE * random.uniform(0.8, 1.0))
+        # Store branch data as flat arrays, sorted once from thickest to thinnest
+        branch_start = np.concatenate([level[0] for level in levels]).astype(np.float32)
+        branch_end = np.concatenate([level[1] for level in levels]).astype(np.float32)
+        branch_thickness = np.concatenate(
+            [np.full(len(level[0]), level[2], np.float32) for level in levels])
+        branch_depth = np.concatenate(
+            [np.full(len(level[0]), level[3], np.int8) for level in levels])
+        order = np.argsort(-branch_thickness, kind='stable')
+        self.branch_start = branch_start[order]
+        self.branch_end = branch_end[order]
+        self.branch_thickness = branch_thickness[order]
+        self.branch_depth = branch_depth[order]
         
-        # Main branch continuation
-        self.grow_tree(end_x, end_y, new_length, angle, new_thickness, depth + 1)
+        # Create a cluster of leaves at every branch tip
+        tips = np.concatenate(tips)
+        leaf_counts = rng.integers(8, 15, len(tips), endpoint=True)
+        anchors = np.repeat(tips, leaf_counts, axis=0)
+        offsets = np.stack((rng.uniform(-15, 15, len(anchors)), rng.uniform(-15, 5, len(anchors))), axis=1)
+        self.leaves = (anchors + offsets).astype(np.float32)
         
-        # Create additional branches (1-3 per node)
-        branch_count = random.randint(1, MAX_BRANCHES)
-        for i in range(branch_count):
-            # Determine branch angle based on position
-            branch_angle = angle + ANGLE_VARIATION * random.uniform(0.5, 1.5) * (1 if i % 2 == 0 else -1)
+        # Stipple bark dots around the middle of every thick branch
+        self.bark_counts = np.where(
+            self.branch_thickness > 3, (self.branch_thickness * 0.8).astype(np.int64), 0)
+        bark_thickness = np.repeat(self.branch_thickness, self.bark_counts)[:, None]
+        midpoints = np.repeat((self.branch_start + self.branch_end) / 2, self.bark_counts, axis=0)
+        self.bark = (midpoints + rng.uniform(-1, 1, midpoints.shape) * bark_thickness * 0.3).astype(np.float32)
+        self.bark_radius = np.maximum(1, (bark_thickness[:, 0] * 0.15).astype(np.int64))
+    
+    def render_layers(self):
+        # Rasterize each depth level once; wind only moves whole levels
+        self.layers = []
+        branch_starts, branch_ends = self.branch_start.tolist(), self.branch_end.tolist()
+        thicknesses = self.branch_thickness.tolist()
+        bark, bark_radius = self.bark.tolist(), self.bark_radius.tolist()
+        bark_ends = np.cumsum(self.bark_counts).tolist()
+        for depth in np.unique(self.branch_depth).tolist():
+            in_level = self.branch_depth == depth
+            start, end = self.branch_start[in_level], self.branch_end[in_level]
+            margin = float(self.branch_thickness[in_level].max()) + 2
+            left = int(min(start[:, 0].min(), end[:, 0].min()) - margin)
+            top = int(min(start[:, 1].min(), end[:, 1].min()) - margin)
+            right = int(max(start[:, 0].max(), end[:, 0].max()) + margin)
+            bottom = int(max(start[:, 1].max(), end[:, 1].max()) + margin)
+            layer = pygame.Surface((right - left, bottom - top), pygame.SRCALPHA)
             
-            # Adjust branch length based on angle
-            branch_length = new_length * random.uniform(0.5, 0.8)
+            # Color gradient based on depth (darker near trunk, lighter near ends)
+            brown_shade = 60 + int(195 * (depth / MAX_DEPTH))
+            color = (brown_shade, brown_shade // 2, brown_shade // 3)
+            bark_color = (max(0, color[0]-10), max(0, color[1]-10), max(0, color[2]-10))
+            
+            for branch in np.flatnonzero(in_level).tolist():
+                (start_x, start_y), (end_x, end_y) = branch_starts[branch], branch_ends[branch]
+                
+                # Draw branch with thickness
+                pygame.draw.line(
+                    layer, 
+                    color, 
+                    (start_x - left, start_y - top), 
+                    (end_x - left, end_y - top), 
+                    max(1, int(thicknesses[branch]))
+                )
+                
+                # Bake this branch's bark stipple on top of it
+                first_dot = bark_ends[branch - 1] if branch else 0
+                for (bark_x, bark_y), radius in zip(bark[first_dot:bark_ends[branch]],
+                                                    bark_radius[first_dot:bark_ends[branch]]):
+                    pygame.draw.circle(layer, bark_color, (int(bark_x) - left, int(bark_y) - top), radius)
             
-            self.grow_tree(end_x, end_y, branch_length, 
-                          branch_angle, new_thickness, depth + 1)
+            self.layers.append((depth, layer, (left, top)))
     
     def draw(self, surface, wind_direction, wind_strength):
-        # Draw branches first (from thickest to thinnest)
-        sorted_branches = sorted(self.branches, key=lambda b: b['thickness'], reverse=True)
-        
-        for branch in sorted_branches:
-            start_x, start_y = branch['start']
-            end_x, end_y = branch['end']
-            
+        # Draw branches first, one cached layer per depth from the trunk outwards
+        for depth, layer, (left, top) in self.layers:
             # Apply wind effect - deeper branches sway more
-            wind_factor = branch['depth'] / MAX_DEPTH
+            wind_factor = depth / MAX_DEPTH
             sway_x = math.sin(wind_direction) * wind_strength * wind_factor * 3
             sway_y = math.cos(wind_direction) * wind_strength * wind_factor * 1.5
-            
-            # Color gradient based on depth (darker near trunk, lighter near ends)
-            brown_shade = 60 + int(195 * (branch['depth'] / MAX_DEPTH))
-            color = (brown_shade, brown_shade // 2, brown_shade // 3)
-            
-            # Draw branch with thickness
-            pygame.draw.line(
-                surface, 
-                color, 
-                (start_x + sway_x, start_y + sway_y), 
-                (end_x + sway_x, end_y + sway_y), 
-                max(1, int(branch['thickness']))
-            )
-            
-            # Add bark texture to thicker branches
-            if branch['thickness'] > 3:
-                for i in range(int(branch['thickness'] * 0.8)):
-                    offset_x = random.uniform(-1, 1) * branch['thickness'] * 0.3
-                    offset_y = random.uniform(-1, 1) * branch['thickness'] * 0.3
-                    bark_color = (max(0, color[0]-10), max(0, color[1]-10), max(0, color[2]-10))
-                    pygame.draw.circle(
-                        surface, 
-                        bark_color, 
-                        (int((start_x+end_x)/2 + sway_x + offset_x), 
-                         int((start_y+end_y)/2 + sway_y + offset_y)), 
-                        max(1, int(branch['thickness'] * 0.15))
-                    )  # <-- Fixed missing parenthesis here
+            surface.blit(layer, (left + sway_x, top + sway_y))
         
         # Draw leaves
-        for leaf_x, leaf_y in self.leaves:
-            # Apply wind effect to leaves
-            leaf_wind_x = math.sin(wind_direction) * wind_strength * random.uniform(0.5, 1.5) * 4
-            leaf_wind_y = math.cos(wind_direction) * wind_strength * random.uniform(0.2, 0.7) * 2
-            
-            # Choose leaf color based on season
-            if current_season == 1:  # Autumn - more color variation
-                leaf_color = random.choice(LEAF_COLORS[random.randint(1, 4)])
-            elif current_season == 3:  # Spring - light green
-                leaf_color = random.choice(LEAF_COLORS[5])
-            elif current_season == 2:  # Winter - no leaves
-                continue
-            else:  # Summer - green
-                leaf_color = random.choice(LEAF_COLORS[0])
-            
-            # Draw leaf as a small circle with seasonal variation
-            if current_season == 1:  # Autumn leaves are more varied
-                size = LEAF_SIZE * random.uniform(0.8, 1.2)
-                pygame.draw.ellipse(
-                    surface, 
-                    leaf_color, 
-                    (leaf_x + leaf_wind_x - size/2, 
-                     leaf_y + leaf_wind_y - size/2, 
-                     size, size * 1.5)
-                )
-            else:
-                pygame.draw.circle(
-                    surface, 
-                    leaf_color, 
-                    (int(leaf_x + leaf_wind_x), int(leaf_y + leaf_wind_y)), 
-                    LEAF_SIZE
-                )
+        if self.season == 2:  # Winter - no leaves
+            return
+        
+        # Apply wind effect to all leaves at once
+        count = len(self.leaves)
+        leaf_wind = np.stack((
+            math.sin(wind_direction) * wind_strength * rng.uniform(0.5, 1.5, count) * 4,
+            math.cos(wind_direction) * wind_strength * rng.uniform(0.2, 0.7, count) * 2
+        ), axis=1)
+        positions = (self.leaves + leaf_wind).astype(int) - self.leaf_offsets
+        surface.blits(zip(itertools.repeat(leaf_sprites.sheet), positions.tolist(), self.leaf_areas),
+                      doreturn=False)
+    
+    def set_season(self, season):
+        # Pick every leaf's color and size once for the season
+        self.season = season
+        season_rng = np.random.default_rng([self.seed, season])
+        count = len(self.leaves)
+        shade = season_rng.integers(0, 3, count)
+        
+        if season == 1:  # Autumn - more color variation, varied ellipses
+            palette = season_rng.integers(1, 4, count, endpoint=True)
+            column = leaf_sprites.ellipse_column(LEAF_SIZE * season_rng.uniform(0.8, 1.2, count))
+        else:
+            palette = np.full(count, 5 if season == 3 else 0)  # Spring light green, summer green
+            column = np.zeros(count, np.int64)
+        
+        sprites = leaf_sprites.sprite(palette * 3 + shade, column)
+        self.leaf_offsets = leaf_sprites.offsets[column][:, None]
+        self.leaf_areas = [leaf_sprites.areas[sprite] for sprite in sprites.tolist()]
+    
+    def save(self, path):
+        # Lay the arrays out back to back, each aligned for memory mapping
+        arrays = [np.ascontiguousarray(getattr(self, name)) for name in TREE_ARRAYS]
+        table = {}
+        offset = 0
+        for name, array in zip(TREE_ARRAYS, arrays):
+            offset = -(-offset // ARRAY_ALIGN) * ARRAY_ALIGN
+            table[name] = {'dtype': array.dtype.str, 'shape': array.shape, 'offset': offset}
+            offset += array.nbytes
+        
+        header = json.dumps({
+            'seed': self.seed, 'x': self.x, 'y': self.y,
+            'trunk_length': self.trunk_length, 'trunk_thickness': self.trunk_thickness,
+            'angle': self.angle, 'max_branches': self.max_branches, 'arrays': table
+        }).encode()
+        data_start = -(-(TREE_PREAMBLE.size + len(header)) // ARRAY_ALIGN) * ARRAY_ALIGN
+        
+        with open(path, 'wb') as f:
+            f.write(TREE_PREAMBLE.pack(TREE_MAGIC, TREE_FORMAT_VERSION, len(header)))
+            f.write(header)
+            for name, array in zip(TREE_ARRAYS, arrays):
+                f.seek(data_start + table[name]['offset'])
+                f.write(array.tobytes())
+    
+    @classmethod
+    def load(cls, path, season=0):
+        with open(path, 'rb') as f:
+            magic, version, header_length = TREE_PREAMBLE.unpack(f.read(TREE_PREAMBLE.size))
+            if magic != TREE_MAGIC or version != TREE_FORMAT_VERSION:
+                raise ValueError(f"{path} is not a version {TREE_FORMAT_VERSION} tree file")
+            header = json.loads(f.read(header_length))
+        data_start = -(-(TREE_PREAMBLE.size + header_length) // ARRAY_ALIGN) * ARRAY_ALIGN
+        
+        # Rebuild the tree around read-only views of the mapped file instead of regrowing it
+        tree = cls.__new__(cls)
+        for name in ('seed', 'x', 'y', 'trunk_length', 'trunk_thickness', 'angle', 'max_branches'):
+            setattr(tree, name, header[name])
+        data = np.memmap(path, dtype=np.uint8, mode='r')
+        for name in TREE_ARRAYS:
+            entry = header['arrays'][name]
+            dtype, shape = np.dtype(entry['dtype']), tuple(entry['shape'])
+            start = data_start + entry['offset']
+            size = dtype.itemsize * math.prod(shape)
+            setattr(tree, name, data[start:start + size].view(dtype).reshape(shape))
+        tree.render_layers()
+        tree.set_season(season)
+        return tree
 
-def draw_ground(surface):
-    # Draw ground with texture
-    pygame.draw.rect(surface, GROUND_GREEN, (0, HEIGHT - 120, WIDTH, 120))
-    
-    # Draw grass details
-    for i in range(0, WIDTH, 4):
-        grass_height = random.randint(5, 15)
-        sway = math.sin(pygame.time.get_ticks() / 300 + i * 0.05) * 3
-        color = random.choice([(34, 139, 34), (20, 120, 20), (50, 160, 60)])
-        pygame.draw.line(
-            surface, 
-            color, 
-            (i, HEIGHT - 120), 
-            (i + sway, HEIGHT - 120 - grass_height), 
-            2
-        )
-    
-    # Draw flowers in spring
-    if current_season == 3:
-        for i in range(30):
-            x = random.randint(0, WIDTH)
-            y = HEIGHT - 130 + random.randint(0, 20)
-            color = random.choice([(255, 100, 100), (255, 200, 50), (200, 50, 200), (255, 150, 150)])
-            pygame.draw.circle(surface, color, (x, y), 3)
-            pygame.draw.line(surface, (50, 150, 50), (x, y+3), (x, y+10), 1)
+# A directory of saved trees that can be swapped in without growing anything
+class TreeLibrary:
+    def __init__(self, directory=TREE_LIBRARY_DIR):
+        self.directory = directory
+        self.paths = []
+        if os.path.isdir(directory):
+            self.paths = sorted(os.path.join(directory, name)
+                                for name in os.listdir(directory) if name.endswith('.tree'))
+    
+    def path_for(self, tree):
+        return os.path.join(self.directory, f"tree_{tree.seed}.tree")
+    
+    def add(self, tree):
+        path = self.path_for(tree)
+        # Never rewrite a file that a loaded tree may still have mapped
+        if path not in self.paths:
+            os.makedirs(self.directory, exist_ok=True)
+            tree.save(path)
+            self.paths.append(path)
+        return path
+    
+    def take(self, season):
+        return Tree.load(random.choice(self.paths), season)
+    
+    def choose(self, exclude=None):
+        # A random saved tree other than the excluded one, or None if there is none
+        paths = [path for path in self.paths if exclude is None or path != self.path_for(exclude)]
+        return random.choice(paths) if paths else None
 
-def draw_sun(surface, season):
+# Ground band, grass blades and spring flowers laid out once
+class Ground:
+    GRASS_COLORS = [(34, 139, 34), (20, 120, 20), (50, 160, 60)]
+    FLOWER_COLORS = [(255, 100, 100), (255, 200, 50), (200, 50, 200), (255, 150, 150)]
+    SWAY_FRAMES = 64
+    STRIP_TOP = HEIGHT - 140
+    
+    def __init__(self, seed=None):
+        ground_rng = np.random.default_rng(seed)
+        
+        # Static ground band
+        self.band = pygame.Surface((WIDTH, 120))
+        self.band.fill(GROUND_GREEN)
+        
+        # Grass blade layout: one blade every 4 pixels
+        blade_x = np.arange(0, WIDTH, 4)
+        blade_height = ground_rng.integers(5, 15, len(blade_x), endpoint=True)
+        blade_color = ground_rng.integers(0, len(self.GRASS_COLORS), len(blade_x))
+        blade_phase = blade_x * 0.05
+        
+        # Pre-render the blades at evenly spaced points of the sway cycle
+        self.grass_frames = []
+        base_y = HEIGHT - 120 - self.STRIP_TOP
+        tip_y = (base_y - blade_height).tolist()
+        colors = [self.GRASS_COLORS[i] for i in blade_color.tolist()]
+        for frame in range(self.SWAY_FRAMES):
+            sway = np.sin(frame / self.SWAY_FRAMES * math.pi * 2 + blade_phase) * 3
+            strip = pygame.Surface((WIDTH, 140 - 120 + 4), pygame.SRCALPHA)
+            for x, tip_x, top, color in zip(blade_x.tolist(), (blade_x + sway).tolist(), tip_y, colors):
+                pygame.draw.line(strip, color, (x, base_y), (tip_x, top), 2)
+            self.grass_frames.append(strip)
+        
+        # Spring flowers
+        self.flowers = pygame.Surface((WIDTH, 40), pygame.SRCALPHA)
+        flower_x = ground_rng.integers(0, WIDTH, 30, endpoint=True)
+        flower_y = HEIGHT - 130 + ground_rng.integers(0, 20, 30, endpoint=True) - self.STRIP_TOP
+        flower_color = ground_rng.integers(0, len(self.FLOWER_COLORS), 30)
+        for x, y, color in zip(flower_x.tolist(), flower_y.tolist(), flower_color.tolist()):
+            pygame.draw.circle(self.flowers, self.FLOWER_COLORS[color], (x, y), 3)
+            pygame.draw.line(self.flowers, (50, 150, 50), (x, y+3), (x, y+10), 1)
+    
+    def draw(self, surface, ticks, season):
+        surface.blit(self.band, (0, HEIGHT - 120))
+        
+        # Grass sways through the cached frames with time
+        frame = int(ticks / 300 / (math.pi * 2) * self.SWAY_FRAMES) % self.SWAY_FRAMES
+        surface.blit(self.grass_frames[frame], (0, self.STRIP_TOP))
+        
+        # Draw flowers in spring
+        if season == 3:
+            surface.blit(self.flowers, (0, self.STRIP_TOP))
+
+# Sun sprites keyed by season, rendered on first use
+sun_sprites = {}
+
+def render_sun(season):
     sun_color = (255, 255, 200) if season == 0 else (255, 220, 150)  # Brighter in summer
-    sun_x = 150 if season == 0 else 850  # Position changes with seasons
+    sprite = pygame.Surface((140, 140), pygame.SRCALPHA)
     
-    # Draw sun glow
+    # Sun glow
     for size in range(50, 70, 5):
         alpha = 200 - (size - 50) * 10
         s = pygame.Surface((size*2, size*2), pygame.SRCALPHA)
         pygame.draw.circle(s, (*sun_color, alpha), (size, size), size)
-        surface.blit(s, (sun_x - size, 100 - size))
+        sprite.blit(s, (70 - size, 70 - size))
     
-    # Draw sun core
-    pygame.draw.circle(surface, sun_color, (sun_x, 100), 40)
+    # Sun core
+    pygame.draw.circle(sprite, sun_color, (70, 70), 40)
     
-    # Draw sun rays
+    # Sun rays
     for i in range(0, 360, 15):
         angle = math.radians(i)
-        start_x = sun_x + math.cos(angle) * 45
-        start_y = 100 + math.sin(angle) * 45
-        end_x = sun_x + math.cos(angle) * 65
-        end_y = 100 + math.sin(angle) * 65
-        pygame.draw.line(surface, sun_color, (start_x, start_y), (end_x, end_y), 4)
+        start = (70 + math.cos(angle) * 45, 70 + math.sin(angle) * 45)
+        end = (70 + math.cos(angle) * 65, 70 + math.sin(angle) * 65)
+        pygame.draw.line(sprite, sun_color, start, end, 4)
+    return sprite
+
+def draw_sun(surface, season):
+    if season not in sun_sprites:
+        sun_sprites[season] = render_sun(season)
+    sun_x = 150 if season == 0 else 850  # Position changes with seasons
+    surface.blit(sun_sprites[season], (sun_x - 70, 100 - 70))
+
+# Every cloud shares the same puffs, so they are drawn once into a sprite
+CLOUD_POSITIONS = [(100, 80), (400, 60), (700, 100), (250, 150)]
+CLOUD_LEFT, CLOUD_TOP = 40, 50
+
+def render_cloud():
+    sprite = pygame.Surface((CLOUD_LEFT + 100, CLOUD_TOP + 60), pygame.SRCALPHA)
+    for j in range(3):
+        size = 30 + j * 10
+        pygame.draw.circle(sprite, (240, 240, 245), (CLOUD_LEFT + j*25, CLOUD_TOP), size)
+        pygame.draw.circle(sprite, (240, 240, 245), (CLOUD_LEFT + j*25 - 15, CLOUD_TOP + 15), size-5)
+    return sprite
+
+cloud_sprite = None
 
 def draw_clouds(surface):
-    for i, pos in enumerate([(100, 80), (400, 60), (700, 100), (250, 150)]):
-        x, y = pos
+    global cloud_sprite
+    if cloud_sprite is None:
+        cloud_sprite = render_cloud()
+    for i, (x, y) in enumerate(CLOUD_POSITIONS):
         offset = math.sin(pygame.time.get_ticks() / 2000 + i) * 10
-        for j in range(3):
-            size = 30 + j * 10
-            pygame.draw.circle(surface, (240, 240, 245), (x + offset + j*25, y), size)
-            pygame.draw.circle(surface, (240, 240, 245), (x + offset + j*25 - 15, y + 15), size-5)
+        surface.blit(cloud_sprite, (x + offset - CLOUD_LEFT, y - CLOUD_TOP))
+
+# Fixed-capacity pool of falling autumn leaves, one array per attribute
+class FallingLeaves:
+    def __init__(self, capacity=4096):
+        self.capacity = capacity
+        self.count = 0
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.speed = np.zeros(capacity)
+        self.sway = np.zeros(capacity)
+        self.angle = np.zeros(capacity)
+        self.sprite = np.zeros(capacity, dtype=int)
+    
+    def spawn(self, count):
+        count = min(count, self.capacity - self.count)
+        if count <= 0:
+            return
+        new = slice(self.count, self.count + count)
+        self.x[new] = rng.integers(200, WIDTH - 200, count, endpoint=True)
+        self.y[new] = rng.integers(50, 300, count, endpoint=True)
+        self.speed[new] = rng.uniform(0.5, 2, count)
+        self.sway[new] = rng.uniform(0.05, 0.2, count)
+        self.angle[new] = 0
+        
+        # Any autumn palette, any shade, ellipse sized 3 to 6
+        color = rng.integers(1, 5, count) * 3 + rng.integers(0, 3, count)
+        column = leaf_sprites.ellipse_column(rng.uniform(3, 6, count))
+        self.sprite[new] = leaf_sprites.sprite(color, column)
+        self.count += count
+    
+    def update(self):
+        n = self.count
+        self.y[:n] += self.speed[:n]
+        self.x[:n] += np.sin(self.angle[:n]) * 1.5
+        self.angle[:n] += self.sway[:n]
+        
+        # Drop leaves that reached the ground, keeping the rest packed at the front
+        alive = self.y[:n] <= HEIGHT - 100
+        kept = int(alive.sum())
+        if kept < n:
+            for column in (self.x, self.y, self.speed, self.sway, self.angle, self.sprite):
+                column[:kept] = column[:n][alive]
+            self.count = kept
+    
+    def draw(self, surface):
+        n = self.count
+        if n == 0:
+            return
+        positions = np.column_stack((self.x[:n], self.y[:n])).astype(int).tolist()
+        areas = [leaf_sprites.areas[i] for i in self.sprite[:n].tolist()]
+        surface.blits(zip(itertools.repeat(leaf_sprites.sheet), positions, areas), doreturn=False)
+
+# Grows upcoming trees on a worker thread so the frame loop never waits on grow_tree
+class TreePrefetcher:
+    def __init__(self, library):
+        self.library = library
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.next_tree = self.executor.submit(self.grow)
+        self.next_saved = None
+    
+    def grow(self):
+        return Tree(WIDTH // 2, HEIGHT - 120, 
+                    random.randint(100, 140), 
+                    random.randint(18, 25))
+    
+    def ready(self):
+        return self.next_tree.done()
+    
+    def take(self, season):
+        # Hand out the prefetched tree and start growing its successor
+        tree = self.next_tree.result()
+        tree.set_season(season)
+        self.next_tree = self.executor.submit(self.grow)
+        return tree
+    
+    def prefetch_saved(self, current):
+        # Keep one saved tree other than the current one loading in the background
+        if self.next_saved is None:
+            path = self.library.choose(exclude=current)
+            if path is not None:
+                self.next_saved = self.executor.submit(Tree.load, path)
+    
+    def saved_ready(self):
+        return self.next_saved is not None and self.next_saved.done()
+    
+    def take_saved(self, season):
+        tree = self.next_saved.result()
+        tree.set_season(season)
+        self.next_saved = None
+        return tree
 
-def create_falling_leaf():
-    x = random.randint(200, WIDTH - 200)
-    y = random.randint(50, 300)
-    color = random.choice(LEAF_COLORS[random.randint(1, 4)])
-    size = random.uniform(3, 6)
-    speed = random.uniform(0.5, 2)
-    sway = random.uniform(0.05, 0.2)
-    return {'x': x, 'y': y, 'color': color, 'size': size, 'speed': speed, 'sway': sway, 'angle': 0}
+# Lay out the ground once
+ground = Ground()
+falling_leaves = FallingLeaves()
 
-# Create initial tree
-tree = Tree(WIDTH // 2, HEIGHT - 120, 120, 20)
+# Start from a saved tree if one is given or the library has any
+library = TreeLibrary()
+if len(sys.argv) > 1:
+    tree = Tree.load(sys.argv[1], current_season)
+elif library.paths:
+    tree = library.take(current_season)
+else:
+    tree = Tree(WIDTH // 2, HEIGHT - 120, 120, 20, season=current_season)
+prefetcher = TreePrefetcher(library)
+prefetcher.prefetch_saved(tree)
+tree_requested = False
+season_changed = False
 
 # Main game loop
 clock = pygame.time.Clock()
@@ -261,21 +579,21 @@ while True:
         elif event.type == KEYDOWN:
             if event.key == K_SPACE:
                 # Generate a new tree
-                tree = Tree(WIDTH // 2, HEIGHT - 120, 
-                           random.randint(100, 140), 
-                           random.randint(18, 25))
+                tree_requested = True
+            elif event.key == K_s:
+                # Keep the current tree in the library
+                library.add(tree)
+                prefetcher.prefetch_saved(tree)
             elif event.key == K_RIGHT:
                 current_season = (current_season + 1) % 4
                 season_timer = 0
-                tree = Tree(WIDTH // 2, HEIGHT - 120, 
-                           random.randint(100, 140), 
-                           random.randint(18, 25))
+                tree.set_season(current_season)
+                tree_requested = season_changed = True
             elif event.key == K_LEFT:
                 current_season = (current_season - 1) % 4
                 season_timer = 0
-                tree = Tree(WIDTH // 2, HEIGHT - 120, 
-                           random.randint(100, 140), 
-                           random.randint(18, 25))
+                tree.set_season(current_season)
+                tree_requested = season_changed = True
             elif event.key == K_ESCAPE:
                 pygame.quit()
                 sys.exit()
@@ -286,9 +604,19 @@ while True:
         season_timer = 0
         current_season = (current_season + 1) % 4
         # Create a new tree for the new season
-        tree = Tree(WIDTH // 2, HEIGHT - 120, 
-                   random.randint(100, 140), 
-                   random.randint(18, 25))
+        tree.set_season(current_season)
+        tree_requested = season_changed = True
+    
+    # Season changes swap in a saved tree once one has loaded in the background,
+    # otherwise the prefetched grown tree once it is ready, without blocking the frame
+    if tree_requested and season_changed and prefetcher.saved_ready():
+        tree = prefetcher.take_saved(current_season)
+        tree_requested = season_changed = False
+        prefetcher.prefetch_saved(tree)
+    elif tree_requested and prefetcher.ready():
+        tree = prefetcher.take(current_season)
+        tree_requested = season_changed = False
+        prefetcher.prefetch_saved(tree)
     
     # Update wind
     wind_change_timer += 1
@@ -301,16 +629,11 @@ while True:
     leaf_fall_timer += 1
     if current_season == 1 and leaf_fall_timer > 5 and wind_strength > 2:
         leaf_fall_timer = 0
-        falling_leaves.append(create_falling_leaf())
+        # Stronger wind shakes loose many more leaves
+        falling_leaves.spawn(4 ** (wind_strength - 2))
     
     # Update falling leaves
-    for leaf in falling_leaves[:]:
-        leaf['y'] += leaf['speed']
-        leaf['x'] += math.sin(leaf['angle']) * 1.5
-        leaf['angle'] += leaf['sway']
-        
-        if leaf['y'] > HEIGHT - 100:
-            falling_leaves.remove(leaf)
+    falling_leaves.update()
     
     # Fill background with seasonal color
     bg_color = BACKGROUND_COLORS[current_season]
@@ -324,15 +647,10 @@ while True:
         draw_clouds(screen)
     
     # Draw falling leaves
-    for leaf in falling_leaves:
-        pygame.draw.ellipse(
-            screen, 
-            leaf['color'], 
-            (leaf['x'], leaf['y'], leaf['size'], leaf['size'] * 1.5)
-        )
+    falling_leaves.draw(screen)
     
     # Draw ground
-    draw_ground(screen)
+    ground.draw(screen, pygame.time.get_ticks(), current_season)
     
     # Draw tree
     tree.draw(screen, wind_direction, wind_strength)
@@ -341,6 +659,7 @@ while True:
     season_text = font.render(f"Season: {season_names[current_season]}", True, (30, 30, 30))
     instructions = [
         "SPACE: New Tree",
+        "S: Save Tree",
         "← →: Change Season",
         "ESC: Quit"
     ]
@@ -356,7 +675,7 @@ while True:
     # Draw instructions
     for i, text in enumerate(instructions):
         text_surf = font.render(text, True, (50, 50, 50))
-        screen.blit(text_surf, (20, HEIGHT - 90 + i*25))
+        screen.blit(text_surf, (20, HEIGHT - 105 + i*24))
     
     # Draw wind indicator
     if wind_strength > 0:
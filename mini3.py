@@ -1,7 +1,9 @@
 import pygame
+import numpy as np
 import sys
 import math
 import random
+from collections import OrderedDict
 from pygame.locals import *
 
 # Initialize pygame
@@ -26,77 +28,264 @@ STAR_COLORS = [
 ]
 TEXT_COLOR = (220, 220, 255)
 CONSTELLATION_COLOR = (100, 150, 255, 150)
+CONSTELLATION_LINK_DISTANCE = 300  # Only connect reasonably close stars
+DISCOVER_RADIUS = 100  # How close to a constellation center a click must land
+GRID_CELL_SIZE = 200
+GLOW_SIZE_STEP = 0.25  # Star sizes are rounded to this before picking a glow sprite
+GLOW_BRIGHTNESS_STEP = 8
+STAR_TRAIL_SLOTS = 20
+NEBULA_PULSE_FRAMES = 12  # Distinct sizes a nebula is drawn at over its pulse
 
-# Star class
-class Star:
-    def __init__(self, x=None, y=None, size=None):
-        self.x = x if x is not None else random.randint(0, WIDTH)
-        self.y = y if y is not None else random.randint(0, HEIGHT)
-        self.size = size if size is not None else random.uniform(0.5, 3.0)
-        self.base_size = self.size
-        self.color = random.choice(STAR_COLORS)
-        self.twinkle_speed = random.uniform(0.01, 0.05)
-        self.twinkle_phase = random.uniform(0, 2 * math.pi)
-        self.speed_x = random.uniform(-0.2, 0.2)
-        self.speed_y = random.uniform(-0.2, 0.2)
-        self.in_constellation = False
-        self.constellation_id = None
-        self.trail = []
-        self.max_trail = 10
+# Camera and the endless sky around the starting field
+ZOOM_STEPS_PER_OCTAVE = 4  # Mouse wheel notches to double or halve the zoom
+MIN_ZOOM_STEP, MAX_ZOOM_STEP = -32, 4
+PAN_SPEED = 12  # Screen pixels per frame
+SKY_SEED = 2024
+SKY_TILE_SIZE = 256  # On-screen size of a sky tile when its stars are all shown
+SKY_TILE_STARS = 24
+SKY_CACHE_TILES = 512
+SKY_TOP_LEVEL = -MIN_ZOOM_STEP // ZOOM_STEPS_PER_OCTAVE  # Coarsest tiles, seen fully zoomed out
+
+# Stars created at start: (count, smallest size, largest size)
+STAR_GROUPS = [
+    (400, 0.5, 3.0),
+    (20, 2.5, 4.0),   # Some larger stars
+    (5, 4.5, 6.0),    # A few very large stars
+]
+
+# Random source for the star field
+rng = np.random.default_rng()
+
+# Star glow and core pre-rendered together, keyed by color, quantized size and brightness
+class GlowCache:
+    def __init__(self):
+        self.sprites = {}
+    
+    def get(self, color_index, size_step, brightness_step):
+        key = (color_index, size_step, brightness_step)
+        sprite = self.sprites.get(key)
+        if sprite is None:
+            sprite = self.sprites[key] = self.render(*key)
+        return sprite
+    
+    def batch(self, colors, sizes, brightness, xs, ys):
+        # Look each distinct sprite up once, then hand out (sprite, position) pairs for blits
+        size_steps = np.rint(sizes / GLOW_SIZE_STEP).astype(np.int64)
+        brightness_steps = brightness // GLOW_BRIGHTNESS_STEP
+        codes = (colors * 4096 + size_steps) * 64 + brightness_steps
+        unique, first, inverse = np.unique(codes, return_index=True, return_inverse=True)
+        found = [self.get(int(colors[i]), int(size_steps[i]), int(brightness_steps[i])) for i in first.tolist()]
+        half = np.array([sprite_half for _, sprite_half in found])[inverse]
+        positions = np.stack((xs.astype(np.int64) - half, ys.astype(np.int64) - half), axis=1).tolist()
+        sprites = [found[i][0] for i in inverse.tolist()]
+        return zip(sprites, positions)
+    
+    def render(self, color_index, size_step, brightness_step):
+        color = STAR_COLORS[color_index]
+        size = size_step * GLOW_SIZE_STEP
+        brightness = min(255, brightness_step * GLOW_BRIGHTNESS_STEP + GLOW_BRIGHTNESS_STEP // 2)
+        star_color = (
+            min(255, color[0] * brightness // 255),
+            min(255, color[1] * brightness // 255),
+            min(255, color[2] * brightness // 255)
+        )
         
-    def update(self):
-        # Update position with parallax effect (smaller stars move slower)
+        # Faint glow with the solid core drawn over its middle
+        glow_size = size * 4
+        half = math.ceil(glow_size) + 1
+        sprite = pygame.Surface((half * 2, half * 2), pygame.SRCALPHA)
+        pygame.draw.circle(sprite, (*star_color, 30), (half, half), glow_size)
+        pygame.draw.circle(sprite, star_color, (half, half), int(size))
+        return sprite, half
+
+glow_cache = GlowCache()
+
+# Maps world positions to the screen; zoom moves in fixed steps so cached sizes repeat
+class Camera:
+    def __init__(self):
+        self.reset()
+    
+    def reset(self):
+        self.x, self.y = WIDTH / 2, HEIGHT / 2
+        self.zoom_step = 0
+        self.zoom = 1.0
+    
+    def pan(self, dx, dy):
+        self.x += dx / self.zoom
+        self.y += dy / self.zoom
+    
+    def zoom_by(self, steps, anchor):
+        # Keep the world point under the anchor fixed while zooming
+        anchor_x, anchor_y = self.to_world(*anchor)
+        self.zoom_step = max(MIN_ZOOM_STEP, min(MAX_ZOOM_STEP, self.zoom_step + steps))
+        self.zoom = 2 ** (self.zoom_step / ZOOM_STEPS_PER_OCTAVE)
+        self.x = anchor_x - (anchor[0] - WIDTH / 2) / self.zoom
+        self.y = anchor_y - (anchor[1] - HEIGHT / 2) / self.zoom
+    
+    def to_screen(self, x, y):
+        return (x - self.x) * self.zoom + WIDTH / 2, (y - self.y) * self.zoom + HEIGHT / 2
+    
+    def to_world(self, x, y):
+        return (x - WIDTH / 2) / self.zoom + self.x, (y - HEIGHT / 2) / self.zoom + self.y
+    
+    def visible_bounds(self):
+        half_width, half_height = WIDTH / 2 / self.zoom, HEIGHT / 2 / self.zoom
+        return (self.x - half_width, self.y - half_height, self.x + half_width, self.y + half_height)
+
+def tile_seed(n):
+    # Fold negative tile coordinates onto non-negative seed words
+    return n * 2 if n >= 0 else -n * 2 - 1
+
+# One square of the endless sky. Stars its parent tile shows in this quadrant come
+# first, so zooming in keeps them, then the tile's own stars brightest first
+class SkyTile:
+    COLUMNS = ('x', 'y', 'base_size', 'color', 'twinkle_speed', 'twinkle_phase')
+    
+    def __init__(self, seed, level, tx, ty, parent=None):
+        self.size = SKY_TILE_SIZE * 2.0 ** level
+        left, top = tx * self.size, ty * self.size
+        tile_rng = np.random.default_rng([seed, tile_seed(level), tile_seed(tx), tile_seed(ty)])
+        
+        stars = {
+            'x': left + tile_rng.uniform(0, self.size, SKY_TILE_STARS),
+            'y': top + tile_rng.uniform(0, self.size, SKY_TILE_STARS),
+            'base_size': np.sort(tile_rng.uniform(0.5, 3.0, SKY_TILE_STARS))[::-1],
+            'color': tile_rng.integers(0, len(STAR_COLORS), SKY_TILE_STARS),
+            'twinkle_speed': tile_rng.uniform(0.01, 0.05, SKY_TILE_STARS),
+            'twinkle_phase': tile_rng.uniform(0, 2 * math.pi, SKY_TILE_STARS),
+        }
+        self.inherited = 0
+        if parent is not None:
+            inherited = ((parent.x >= left) & (parent.x < left + self.size) &
+                         (parent.y >= top) & (parent.y < top + self.size))
+            self.inherited = int(np.count_nonzero(inherited))
+            for name in self.COLUMNS:
+                stars[name] = np.concatenate((getattr(parent, name)[inherited], stars[name]))
+        for name in self.COLUMNS:
+            setattr(self, name, stars[name][:SKY_TILE_STARS])
+
+# Endless background sky generated a tile at a time, least recently used tiles dropped
+class SkyTiles:
+    def __init__(self, seed=SKY_SEED, max_tiles=SKY_CACHE_TILES):
+        self.seed = seed
+        self.max_tiles = max_tiles
+        self.tiles = OrderedDict()
+    
+    def tile(self, level, tx, ty):
+        key = (level, tx, ty)
+        tile = self.tiles.get(key)
+        if tile is not None:
+            self.tiles.move_to_end(key)
+            return tile
+        # Coarser tiles are made first, since each tile starts from its parent's stars
+        parent = self.tile(level + 1, tx // 2, ty // 2) if level < SKY_TOP_LEVEL else None
+        tile = self.tiles[key] = SkyTile(self.seed, level, tx, ty, parent)
+        if len(self.tiles) > self.max_tiles:
+            self.tiles.popitem(last=False)
+        return tile
+    
+    def draw(self, surface, camera, ticks):
+        # Use the level whose tiles are at most SKY_TILE_SIZE on screen and show only
+        # the brightest stars of each, so on-screen density stays the same at any zoom
+        level = -camera.zoom_step // ZOOM_STEPS_PER_OCTAVE
+        tile_size = SKY_TILE_SIZE * 2.0 ** level
+        screen_fraction = tile_size * camera.zoom / SKY_TILE_SIZE
+        count = max(1, int(SKY_TILE_STARS * screen_fraction ** 2))
+        
+        left, top, right, bottom = camera.visible_bounds()
+        tiles = [self.tile(level, tx, ty)
+                 for tx in range(math.floor(left / tile_size), math.floor(right / tile_size) + 1)
+                 for ty in range(math.floor(top / tile_size), math.floor(bottom / tile_size) + 1)]
+        
+        # Stars a tile took from its parent stay shown, as the coarser level shows them all
+        shown = [max(count, tile.inherited) for tile in tiles]
+        def column(name):
+            return np.concatenate([getattr(tile, name)[:n] for tile, n in zip(tiles, shown)])
+        
+        x, y = camera.to_screen(column('x'), column('y'))
+        color = column('color')
+        twinkle = np.sin(ticks * column('twinkle_speed') + column('twinkle_phase'))
+        base_size = column('base_size')
+        size = base_size * (0.8 + 0.4 * twinkle)
+        brightness = np.minimum(255, (200 + 55 * twinkle).astype(int))
+        surface.blits(glow_cache.batch(color, size, brightness, x, y), doreturn=False)
+
+# Every star's state in parallel arrays, updated for the whole field at once
+class StarField:
+    def __init__(self, groups):
+        count = sum(group_count for group_count, _, _ in groups)
+        self.x = rng.integers(0, WIDTH, count, endpoint=True).astype(float)
+        self.y = rng.integers(0, HEIGHT, count, endpoint=True).astype(float)
+        self.base_size = np.concatenate([rng.uniform(low, high, group_count) for group_count, low, high in groups])
+        self.size = self.base_size.copy()
+        self.color = rng.integers(0, len(STAR_COLORS), count)
+        self.twinkle_speed = rng.uniform(0.01, 0.05, count)
+        self.twinkle_phase = rng.uniform(0, 2 * math.pi, count)
+        self.brightness = np.full(count, 255)
+        self.speed_x = rng.uniform(-0.2, 0.2, count)
+        self.speed_y = rng.uniform(-0.2, 0.2, count)
+        
+        # Constellation membership and a ring buffer of recent positions per star
+        self.in_constellation = np.zeros(count, dtype=bool)
+        self.constellation_id = np.full(count, -1)
+        self.max_trail = np.full(count, 10)
+        self.trail = np.zeros((count, STAR_TRAIL_SLOTS, 2))
+        self.trail_head = np.zeros(count, dtype=int)
+        self.trail_length = np.zeros(count, dtype=int)
+    
+    def __len__(self):
+        return len(self.x)
+    
+    def update(self, ticks):
+        # Update positions with parallax effect (smaller stars move slower)
         parallax_factor = 0.1 + (self.size / 3.0) * 0.9
         self.x += self.speed_x * parallax_factor
         self.y += self.speed_y * parallax_factor
         
         # Wrap around screen edges
-        if self.x < -10: self.x = WIDTH + 10
-        if self.x > WIDTH + 10: self.x = -10
-        if self.y < -10: self.y = HEIGHT + 10
-        if self.y > HEIGHT + 10: self.y = -10
+        self.x[self.x < -10] = WIDTH + 10
+        self.x[self.x > WIDTH + 10] = -10
+        self.y[self.y < -10] = HEIGHT + 10
+        self.y[self.y > HEIGHT + 10] = -10
         
-        # Twinkle effect
-        self.size = self.base_size * (0.8 + 0.4 * math.sin(pygame.time.get_ticks() * self.twinkle_speed + self.twinkle_phase))
+        # Twinkle effect, from one time sample for the whole field
+        twinkle = np.sin(ticks * self.twinkle_speed + self.twinkle_phase)
+        self.size = self.base_size * (0.8 + 0.4 * twinkle)
+        self.brightness = np.minimum(255, (200 + 55 * twinkle).astype(int))
         
-        # Update trail for constellation stars
-        if self.in_constellation:
-            self.trail.append((self.x, self.y))
-            if len(self.trail) > self.max_trail:
-                self.trail.pop(0)
-    
-    def draw(self, surface):
-        # Draw star
-        brightness = min(255, int(200 + 55 * math.sin(pygame.time.get_ticks() * self.twinkle_speed + self.twinkle_phase)))
-        star_color = (
-            min(255, self.color[0] * brightness // 255),
-            min(255, self.color[1] * brightness // 255),
-            min(255, self.color[2] * brightness // 255)
-        )
-        
-        # Draw glow
-        glow_size = self.size * 4
-        glow_surf = pygame.Surface((glow_size*2, glow_size*2), pygame.SRCALPHA)
-        pygame.draw.circle(glow_surf, (*star_color, 30), (glow_size, glow_size), glow_size)
-        surface.blit(glow_surf, (int(self.x - glow_size), int(self.y - glow_size)))
-        
-        # Draw star core
-        pygame.draw.circle(surface, star_color, (int(self.x), int(self.y)), int(self.size))
+        # Update trails for constellation stars
+        members = np.flatnonzero(self.in_constellation)
+        head = self.trail_head[members]
+        self.trail[members, head] = np.stack((self.x[members], self.y[members]), axis=1)
+        self.trail_head[members] = (head + 1) % STAR_TRAIL_SLOTS
+        self.trail_length[members] = np.minimum(self.trail_length[members] + 1, self.max_trail[members])
+    
+    def draw(self, surface, camera):
+        # Draw every star in one batch, then the constellation trails
+        x, y = camera.to_screen(self.x, self.y)
+        size = self.size * camera.zoom ** 0.5
+        surface.blits(glow_cache.batch(self.color, size, self.brightness, x, y), doreturn=False)
         
-        # Draw trail for constellation stars
-        if self.in_constellation and len(self.trail) > 1:
-            for i in range(1, len(self.trail)):
-                start_pos = self.trail[i-1]
-                end_pos = self.trail[i]
-                alpha = int(200 * i / len(self.trail))
+        members = np.flatnonzero(self.in_constellation & (self.trail_length > 1))
+        for star in members.tolist():
+            length = self.trail_length[star]
+            slots = (self.trail_head[star] - length + np.arange(length)) % STAR_TRAIL_SLOTS
+            trail = np.stack(camera.to_screen(*self.trail[star, slots].T), axis=1).tolist()
+            for i in range(1, length):
+                alpha = int(200 * i / length)
                 pygame.draw.line(
                     surface, 
                     (*CONSTELLATION_COLOR[:3], alpha), 
-                    start_pos, 
-                    end_pos, 
+                    trail[i-1], 
+                    trail[i], 
                     1
                 )
 
+# Zoomed-in nebulae are magnified into this surface, made once; the margin covers
+# the partly visible source pixels at the screen edges at the deepest zoom
+MAX_ZOOM = 2 ** (MAX_ZOOM_STEP / ZOOM_STEPS_PER_OCTAVE)
+nebula_scratch = pygame.Surface((WIDTH + 2 * math.ceil(MAX_ZOOM), HEIGHT + 2 * math.ceil(MAX_ZOOM)), pygame.SRCALPHA)
+
 # Nebula class
 class Nebula:
     def __init__(self):
@@ -109,6 +298,33 @@ class Nebula:
         self.pulse_speed = random.uniform(0.001, 0.005)
         self.pulse_phase = random.uniform(0, 2 * math.pi)
         
+        # One image big enough for the largest pulse, redrawn in place whenever the
+        # drawn radius changes instead of keeping a rendered frame per radius
+        self.image = pygame.Surface((self.size * 2, self.size * 2), pygame.SRCALPHA)
+        self.image_radius = 0
+        
+    def render(self, radius):
+        # Area of the image holding the nebula drawn at this radius
+        area = pygame.Rect(0, 0, radius * 2, radius * 2)
+        if radius == self.image_radius:
+            return area
+        
+        self.image.fill((0, 0, 0, 0), area.union((0, 0, self.image_radius * 2, self.image_radius * 2)))
+        self.image_radius = radius
+        
+        # Draw nebula with multiple layers for depth
+        for i in range(3):
+            layer_size = radius * (1 - i * 0.2)
+            alpha = 80 - i * 20
+            layer_color = (
+                min(255, self.color[0] + i * 20),
+                min(255, self.color[1] + i * 10),
+                min(255, self.color[2] + i * 15),
+                alpha
+            )
+            pygame.draw.circle(self.image, layer_color, (radius, radius), int(layer_size))
+        return area
+        
     def update(self):
         self.x += self.speed_x
         self.y += self.speed_y
@@ -119,30 +335,108 @@ class Nebula:
         if self.y < -self.size: self.y = HEIGHT + self.size
         if self.y > HEIGHT + self.size: self.y = -self.size
         
-    def draw(self, surface):
-        pulse = 0.8 + 0.2 * math.sin(pygame.time.get_ticks() * self.pulse_speed + self.pulse_phase)
-        current_size = int(self.size * pulse)
+    def draw(self, surface, ticks, camera):
+        # Snap the pulse to one of a few sizes so the image is rarely redrawn
+        pulse = math.sin(ticks * self.pulse_speed + self.pulse_phase)
+        frame = round((pulse + 1) / 2 * (NEBULA_PULSE_FRAMES - 1))
+        pulse_size = self.size * (0.8 + 0.2 * (frame / (NEBULA_PULSE_FRAMES - 1) * 2 - 1))
+        zoomed_in = camera.zoom > 1
         
-        nebula_surf = pygame.Surface((current_size*2, current_size*2), pygame.SRCALPHA)
+        # Never drawn above zoom 1, so the image never outgrows the nebula
+        current_size = int(pulse_size if zoomed_in else pulse_size * camera.zoom)
+        screen_size = current_size * camera.zoom if zoomed_in else current_size
         
-        # Draw nebula with multiple layers for depth
-        for i in range(3):
-            layer_size = current_size * (1 - i * 0.2)
-            alpha = 80 - i * 20
-            color = (
-                min(255, self.color[0] + i * 20),
-                min(255, self.color[1] + i * 10),
-                min(255, self.color[2] + i * 15),
-                alpha
-            )
-            pygame.draw.circle(nebula_surf, color, (current_size, current_size), int(layer_size))
+        # Skip nebulae too small or too far away to see
+        x, y = camera.to_screen(self.x, self.y)
+        if (current_size < 1 or x + screen_size < 0 or x - screen_size > WIDTH
+                or y + screen_size < 0 or y - screen_size > HEIGHT):
+            return
+        
+        area = self.render(current_size)
+        left, top = x - screen_size, y - screen_size
+        if not zoomed_in:
+            surface.blit(self.image, (int(left), int(top)), area)
+            return
+        
+        # Zoomed in: magnify only the part of the zoom 1 frame that lands on screen
+        visible = surface.get_rect()
+        source = pygame.Rect(
+            math.floor((visible.left - left) / camera.zoom), 
+            math.floor((visible.top - top) / camera.zoom), 
+            math.ceil(visible.width / camera.zoom) + 1, 
+            math.ceil(visible.height / camera.zoom) + 1
+        ).clip(area)
+        if source.width == 0 or source.height == 0:
+            return
+        magnified = nebula_scratch.subsurface(
+            (0, 0, round(source.width * camera.zoom), round(source.height * camera.zoom))
+        )
+        pygame.transform.scale(self.image.subsurface(source), magnified.get_size(), magnified)
+        surface.blit(magnified, (round(left + source.left * camera.zoom), round(top + source.top * camera.zoom)))
+
+# Uniform grid of cells mapping to the items whose bounds overlap them
+class SpatialGrid:
+    def __init__(self, cell_size=GRID_CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = {}
+        self.item_cells = {}
+    
+    def cell_range(self, bounds):
+        left, top, right, bottom = bounds
+        return (int(left // self.cell_size), int(top // self.cell_size),
+                int(right // self.cell_size), int(bottom // self.cell_size))
+    
+    def update(self, item, bounds):
+        self.place(item, self.cell_range(bounds))
+    
+    def place(self, item, cells):
+        # Only re-bucket an item when it covers different cells
+        old_cells = self.item_cells.get(item)
+        if cells == old_cells:
+            return
+        if old_cells is not None:
+            self.remove(item)
+        self.item_cells[item] = cells
+        left, top, right, bottom = cells
+        for cx in range(left, right + 1):
+            for cy in range(top, bottom + 1):
+                self.cells.setdefault((cx, cy), set()).add(item)
+    
+    def remove(self, item):
+        left, top, right, bottom = self.item_cells.pop(item)
+        for cx in range(left, right + 1):
+            for cy in range(top, bottom + 1):
+                bucket = self.cells[(cx, cy)]
+                bucket.discard(item)
+                if not bucket:
+                    del self.cells[(cx, cy)]
+    
+    def query(self, bounds):
+        found = set()
+        left, top, right, bottom = self.cell_range(bounds)
+        
+        # A wide query only visits occupied cells, so zooming out never costs more than that
+        if (right - left + 1) * (bottom - top + 1) > len(self.cells):
+            for (cx, cy), items in self.cells.items():
+                if left <= cx <= right and top <= cy <= bottom:
+                    found.update(items)
+            return found
         
-        surface.blit(nebula_surf, (int(self.x - current_size), int(self.y - current_size)))
+        for cx in range(left, right + 1):
+            for cy in range(top, bottom + 1):
+                found.update(self.cells.get((cx, cy), ()))
+        return found
+    
+    def query_point(self, x, y, radius):
+        return self.query((x - radius, y - radius, x + radius, y + radius))
 
 # Constellation class
 class Constellation:
-    def __init__(self, stars):
-        self.stars = stars
+    def __init__(self, group, index, members):
+        self.field = field = group.field
+        self.group = group
+        self.index = index
+        self.members = members
         self.id = random.randint(1000, 9999)
         self.name = self.generate_name()
         self.color = CONSTELLATION_COLOR
@@ -151,10 +445,13 @@ class Constellation:
         self.active = False
         
         # Assign constellation to stars
-        for star in self.stars:
-            star.in_constellation = True
-            star.constellation_id = self.id
-            star.max_trail = 20
+        field.in_constellation[members] = True
+        field.constellation_id[members] = self.id
+        field.max_trail[members] = 20
+    
+    @property
+    def center(self):
+        return tuple(self.group.centers[self.index].tolist())
     
     def generate_name(self):
         prefixes = ["Alpha", "Beta", "Gamma", "Delta", "Epsilon", "Zeta", "Eta", "Theta"]
@@ -165,61 +462,88 @@ class Constellation:
         if self.active and self.reveal_progress < 1.0:
             self.reveal_progress += self.reveal_speed
     
-    def draw(self, surface):
+    def draw(self, surface, camera):
         if self.reveal_progress > 0:
             # Draw constellation lines
-            for i in range(len(self.stars)):
-                for j in range(i + 1, len(self.stars)):
-                    # Only draw if both stars are revealed enough
-                    dist = math.sqrt((self.stars[i].x - self.stars[j].x)**2 + 
-                                    (self.stars[i].y - self.stars[j].y)**2)
-                    
-                    if dist < 300:  # Only connect reasonably close stars
-                        alpha = int(200 * min(self.reveal_progress, 1.0))
-                        pygame.draw.line(
-                            surface, 
-                            (*self.color[:3], alpha), 
-                            (self.stars[i].x, self.stars[i].y), 
-                            (self.stars[j].x, self.stars[j].y), 
-                            1
-                        )
+            alpha = int(200 * min(self.reveal_progress, 1.0))
+            points = np.stack((self.field.x[self.members], self.field.y[self.members]), axis=1)
+            dist_sq = ((points[:, None] - points[None]) ** 2).sum(axis=2)
+            first, second = np.nonzero(np.triu(dist_sq < CONSTELLATION_LINK_DISTANCE**2, 1))
+            points = np.stack(camera.to_screen(points[:, 0], points[:, 1]), axis=1).tolist()
+            for i, j in zip(first.tolist(), second.tolist()):
+                pygame.draw.line(
+                    surface, 
+                    (*self.color[:3], alpha), 
+                    points[i], 
+                    points[j], 
+                    1
+                )
             
             # Draw constellation name
             if self.reveal_progress > 0.5:
-                center_x = sum(star.x for star in self.stars) / len(self.stars)
-                center_y = sum(star.y for star in self.stars) / len(self.stars)
+                center_x, center_y = camera.to_screen(*self.center)
                 alpha = int(255 * (self.reveal_progress - 0.5) * 2)
                 
                 name_surf = font.render(self.name, True, (*self.color[:3], alpha))
                 surface.blit(name_surf, (center_x - name_surf.get_width() // 2, 
                                         center_y - 30))
 
-# Create stars
-stars = [Star() for _ in range(400)]
-
-# Create some larger stars
-for _ in range(20):
-    x = random.randint(0, WIDTH)
-    y = random.randint(0, HEIGHT)
-    size = random.uniform(2.5, 4.0)
-    stars.append(Star(x, y, size))
+# Every constellation's members in one flat array, so centers and bounds for all of
+# them come from one pass over the star field
+class ConstellationSet:
+    def __init__(self, field, member_lists, grid):
+        self.field = field
+        self.grid = grid
+        self.members = np.concatenate(member_lists)
+        self.counts = np.array([len(members) for members in member_lists])
+        self.offsets = np.cumsum(self.counts) - self.counts
+        self.items = [Constellation(self, i, self.members[start:start + count])
+                      for i, (start, count) in enumerate(zip(self.offsets.tolist(), self.counts.tolist()))]
+        self.cells = np.full((len(self.items), 4), np.iinfo(np.int64).min)
+        self.refresh()
+    
+    def __iter__(self):
+        return iter(self.items)
+    
+    def __len__(self):
+        return len(self.items)
+    
+    def refresh(self):
+        # Centers and bounding boxes for every constellation at once
+        xs = self.field.x[self.members]
+        ys = self.field.y[self.members]
+        self.centers = np.stack((np.add.reduceat(xs, self.offsets) / self.counts,
+                                 np.add.reduceat(ys, self.offsets) / self.counts), axis=1)
+        left, top = np.minimum.reduceat(xs, self.offsets), np.minimum.reduceat(ys, self.offsets)
+        right, bottom = np.maximum.reduceat(xs, self.offsets), np.maximum.reduceat(ys, self.offsets)
+        
+        # Grid cells each box covers once grown by the discover radius; only the
+        # constellations that moved into different cells are re-bucketed
+        cells = np.floor(np.stack((left - DISCOVER_RADIUS, top - DISCOVER_RADIUS,
+                                   right + DISCOVER_RADIUS, bottom + DISCOVER_RADIUS), axis=1)
+                         / self.grid.cell_size).astype(np.int64)
+        changed = np.flatnonzero((cells != self.cells).any(axis=1))
+        self.cells = cells
+        for i, item_cells in zip(changed.tolist(), cells[changed].tolist()):
+            self.grid.place(self.items[i], tuple(item_cells))
 
-# Create a few very large stars
-for _ in range(5):
-    x = random.randint(0, WIDTH)
-    y = random.randint(0, HEIGHT)
-    size = random.uniform(4.5, 6.0)
-    stars.append(Star(x, y, size))
+# Create stars
+stars = StarField(STAR_GROUPS)
 
 # Create nebulae
 nebulae = [Nebula() for _ in range(5)]
 
 # Create constellations
-constellations = []
-for _ in range(8):
-    # Select 4-8 stars for a constellation
-    constellation_stars = random.sample(stars, random.randint(4, 8))
-    constellations.append(Constellation(constellation_stars))
+# Select 4-8 stars for each constellation
+constellation_stars = [np.array(random.sample(range(len(stars)), random.randint(4, 8))) for _ in range(8)]
+
+# Index constellations by area so clicks and drawing only visit nearby ones
+constellation_grid = SpatialGrid()
+constellations = ConstellationSet(stars, constellation_stars, constellation_grid)
+
+# Camera over the endless sky, starting on the original field
+camera = Camera()
+sky = SkyTiles()
 
 # Create shooting stars
 shooting_stars = []
@@ -268,21 +592,30 @@ while True:
                     constellation.reveal_progress = 0
                     constellation.active = False
                 discovered_constellations = 0
+            elif event.key == K_HOME:
+                camera.reset()
             elif event.key == K_ESCAPE:
                 pygame.quit()
                 sys.exit()
         elif event.type == MOUSEBUTTONDOWN:
             if event.button == 1:  # Left mouse button
                 # Try to activate a constellation
-                for constellation in constellations:
+                click_x, click_y = camera.to_world(*event.pos)
+                radius = DISCOVER_RADIUS / camera.zoom
+                for constellation in constellation_grid.query_point(click_x, click_y, radius):
                     if not constellation.active:
-                        center_x = sum(star.x for star in constellation.stars) / len(constellation.stars)
-                        center_y = sum(star.y for star in constellation.stars) / len(constellation.stars)
-                        distance = math.sqrt((event.pos[0] - center_x)**2 + (event.pos[1] - center_y)**2)
+                        center_x, center_y = constellation.center
+                        distance_sq = (click_x - center_x)**2 + (click_y - center_y)**2
                         
-                        if distance < 100:
+                        if distance_sq < radius**2:
                             constellation.active = True
                             discovered_constellations += 1
+        elif event.type == MOUSEWHEEL:
+            camera.zoom_by(event.y, pygame.mouse.get_pos())
+    
+    # Pan the camera with the arrow keys
+    keys = pygame.key.get_pressed()
+    camera.pan((keys[K_RIGHT] - keys[K_LEFT]) * PAN_SPEED, (keys[K_DOWN] - keys[K_UP]) * PAN_SPEED)
     
     # Update shooting star timer
     shooting_star_timer += 1
@@ -291,8 +624,8 @@ while True:
         shooting_stars.append(create_shooting_star())
     
     # Update stars
-    for star in stars:
-        star.update()
+    ticks = pygame.time.get_ticks()
+    stars.update(ticks)
     
     # Update nebulae
     for nebula in nebulae:
@@ -301,6 +634,7 @@ while True:
     # Update constellations
     for constellation in constellations:
         constellation.update()
+    constellations.refresh()
     
     # Update shooting stars
     for shooting_star in shooting_stars[:]:
@@ -320,34 +654,20 @@ while True:
     # Draw everything
     screen.fill(DEEP_SPACE)
     
+    # Draw the distant sky
+    sky.draw(screen, camera, ticks)
+    
     # Draw nebulae
     for nebula in nebulae:
-        nebula.draw(screen)
+        nebula.draw(screen, ticks, camera)
     
     # Draw constellation connections
     if view_mode == "constellation":
-        for constellation in constellations:
-            constellation.draw(screen)
-    
-    # Draw star trails first (for constellations)
-    for star in stars:
-        if star.in_constellation and view_mode == "constellation":
-            if len(star.trail) > 1:
-                for i in range(1, len(star.trail)):
-                    start_pos = star.trail[i-1]
-                    end_pos = star.trail[i]
-                    alpha = int(200 * i / len(star.trail))
-                    pygame.draw.line(
-                        screen, 
-                        (*CONSTELLATION_COLOR[:3], alpha), 
-                        start_pos, 
-                        end_pos, 
-                        1
-                    )
-    
-    # Draw stars
-    for star in stars:
-        star.draw(screen)
+        for constellation in constellation_grid.query(camera.visible_bounds()):
+            constellation.draw(screen, camera)
+    
+    # Draw stars and their trails
+    stars.draw(screen, camera)
     
     # Draw shooting stars
     for shooting_star in shooting_stars:
@@ -378,11 +698,12 @@ while True:
         "C: Toggle Constellation View",
         "R: Reset Constellations",
         "Click near constellation centers to discover them",
+        "Arrows: Pan   Wheel: Zoom   Home: Reset View",
         "ESC: Quit"
     ]
     
     # Draw semi-transparent background for text
-    text_bg_height = 130
+    text_bg_height = 155
     text_bg = pygame.Surface((WIDTH, text_bg_height), pygame.SRCALPHA)
     text_bg.fill((0, 0, 0, 150))
     screen.blit(text_bg, (0, HEIGHT - text_bg_height))
@@ -392,6 +713,10 @@ while True:
         text_surf = font.render(text, True, TEXT_COLOR)
         screen.blit(text_surf, (20, HEIGHT - text_bg_height + 20 + i*25))
     
+    # Draw zoom level
+    zoom_text = font.render(f"Zoom: {camera.zoom:.2f}x", True, TEXT_COLOR)
+    screen.blit(zoom_text, (WIDTH - zoom_text.get_width() - 20, HEIGHT - text_bg_height + 20))
+    
     # Draw view mode indicator
     mode_text = font.render(f"View Mode: {view_mode.capitalize()}", True, 
                           (100, 200, 255) if view_mode == "constellation" else TEXT_COLOR)